@@ -3,26 +3,47 @@
 Script to apply code quality tools (pylint, black, isort) to all Python files in the project
 """
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+def run_tool(command):
+    """Run a command and return (returncode, stdout, stderr)"""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+        return result.returncode, result.stdout, result.stderr
+    except Exception as e:
+        return None, "", str(e)
+
+
+def report_result(description, outcome):
+    """Print the status of a finished tool run"""
+    returncode, stdout, stderr = outcome
+    if returncode is None:
+        print(f"❌ Error running {description}: {stderr}")
+    elif returncode == 0:
+        print(f"✅ {description} completed successfully")
+        if stdout.strip():
+            print(f"Output: {stdout.strip()}")
+    else:
+        print(f"⚠️ {description} completed with warnings/errors")
+        if stdout.strip():
+            print(f"Output: {stdout.strip()}")
+        if stderr.strip():
+            print(f"Errors: {stderr.strip()}")
+
+
 def run_command(command, description):
     """Run a command and report results"""
     print(f"\n🔧 {description}...")
-    try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, check=False)
-        if result.returncode == 0:
-            print(f"✅ {description} completed successfully")
-            if result.stdout.strip():
-                print(f"Output: {result.stdout.strip()}")
-        else:
-            print(f"⚠️ {description} completed with warnings/errors")
-            if result.stdout.strip():
-                print(f"Output: {result.stdout.strip()}")
-            if result.stderr.strip():
-                print(f"Errors: {result.stderr.strip()}")
-    except Exception as e:
-        print(f"❌ Error running {description}: {e}")
+    report_result(description, run_tool(command))
+
+
+def format_files(python_exe, files):
+    """Run black then isort over one partition of the files"""
+    black = run_tool([python_exe, "-m", "black", "--line-length", "100", *files])
+    isort = run_tool([python_exe, "-m", "isort", "--profile", "black", *files])
+    return black, isort
 
 
 def main():
@@ -41,60 +62,51 @@ def main():
     
     print(f"\n📂 Working directory: {Path.cwd()}")
     
-    # Step 1: Format code with black
+    # Walk the filesystem once; every stage and the summary reuse this list.
+    # dict.fromkeys drops files matched by more than one pattern, keeping order.
+    all_python_files = list(dict.fromkeys(
+        str(f)
+        for pattern in python_files
+        for f in Path(".").glob(pattern)
+        if f.name != "__pycache__"
+    ))
+    
+    if not all_python_files:
+        print("⚠️ No Python files found")
+        return
+    
+    # Steps 1 & 2: Format with black and sort imports with isort.
+    # Both tools rewrite the same files, so instead of racing them against each
+    # other the files are split into disjoint halves that are formatted concurrently.
     print("\n" + "="*60)
-    print("🎨 FORMATTING CODE WITH BLACK")
+    print("🎨 FORMATTING CODE WITH BLACK AND ISORT")
     print("="*60)
     
-    for pattern in python_files:
-        files = list(Path(".").glob(pattern))
-        for file_path in files:
-            if file_path.name != "__pycache__":
-                run_command(
-                    f'{python_exe} -m black "{file_path}" --line-length 100',
-                    f"Formatting {file_path}"
-                )
+    partitions = [all_python_files[i::2] for i in range(2) if all_python_files[i::2]]
+    with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+        futures = [executor.submit(format_files, python_exe, files) for files in partitions]
+        outcomes = [future.result() for future in futures]
     
-    # Step 2: Sort imports with isort
-    print("\n" + "="*60)
-    print("📚 SORTING IMPORTS WITH ISORT")
-    print("="*60)
-    
-    for pattern in python_files:
-        files = list(Path(".").glob(pattern))
-        for file_path in files:
-            if file_path.name != "__pycache__":
-                run_command(
-                    f'{python_exe} -m isort "{file_path}" --profile black',
-                    f"Sorting imports in {file_path}"
-                )
+    for files, (black, isort) in zip(partitions, outcomes):
+        report_result(f"Formatting {len(files)} files with black", black)
+        report_result(f"Sorting imports in {len(files)} files", isort)
     
-    # Step 3: Run pylint analysis
+    # Step 3: Run pylint analysis (-j 0 spreads files across all cores)
     print("\n" + "="*60)
     print("🔍 RUNNING PYLINT ANALYSIS")
     print("="*60)
     
-    for pattern in python_files:
-        files = list(Path(".").glob(pattern))
-        for file_path in files:
-            if file_path.name != "__pycache__":
-                run_command(
-                    f'{python_exe} -m pylint "{file_path}" --rcfile=.pylintrc',
-                    f"Analyzing {file_path} with pylint"
-                )
+    run_command(
+        [python_exe, "-m", "pylint", "-j", "0", "--rcfile=.pylintrc", *all_python_files],
+        f"Analyzing {len(all_python_files)} files with pylint"
+    )
     
     # Step 4: Generate summary report
     print("\n" + "="*60)
     print("📊 GENERATING SUMMARY REPORT")
     print("="*60)
     
-    # Count Python files
-    total_files = 0
-    for pattern in python_files:
-        files = list(Path(".").glob(pattern))
-        total_files += len([f for f in files if f.name != "__pycache__"])
-    
-    print(f"✅ Processed {total_files} Python files")
+    print(f"✅ Processed {len(all_python_files)} Python files")
     print("\n🎯 Code quality improvements applied:")
     print("   • Consistent formatting with Black")
     print("   • Sorted imports with isort")
@@ -104,23 +116,6 @@ def main():
     print("   • Review pylint warnings and fix any critical issues")
     print("   • Consider adding pre-commit hooks for automatic formatting")
     print("   • Add these tools to your CI/CD pipeline")
-    
-    # Optional: Run a final pylint check on all files
-    print("\n" + "="*60)
-    print("🏁 FINAL QUALITY SCORE")
-    print("="*60)
-    
-    all_python_files = []
-    for pattern in python_files:
-        files = list(Path(".").glob(pattern))
-        all_python_files.extend([str(f) for f in files if f.name != "__pycache__"])
-    
-    if all_python_files:
-        files_str = " ".join(f'"{f}"' for f in all_python_files)
-        run_command(
-            f'{python_exe} -m pylint {files_str} --rcfile=.pylintrc',
-            "Final pylint score for all files"
-        )
 
 
 if __name__ == "__main__":
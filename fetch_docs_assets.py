@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Script to download the Swagger UI and ReDoc assets into static/ so /docs and /redoc
+are served locally instead of from the UNPKG CDN
+"""
+import sys
+import urllib.request
+from pathlib import Path
+
+ASSETS = {
+    "swagger-ui-bundle.js": "https://unpkg.com/swagger-ui-dist@5/swagger-ui-bundle.js",
+    "swagger-ui.css": "https://unpkg.com/swagger-ui-dist@5/swagger-ui.css",
+    "redoc.standalone.js": "https://unpkg.com/redoc@next/bundles/redoc.standalone.js",
+}
+
+static_dir = Path(__file__).parent / "static"
+static_dir.mkdir(exist_ok=True)
+
+try:
+    for name, url in ASSETS.items():
+        with urllib.request.urlopen(url, timeout=30) as response:
+            (static_dir / name).write_bytes(response.read())
+        print(f"✅ Downloaded {name}")
+
+    print(f"✅ Docs assets saved to {static_dir}")
+
+except Exception as e:
+    print(f"❌ Error downloading docs assets: {e}")
+    print("The API will keep serving /docs and /redoc from UNPKG")
+    sys.exit(1)
\ No newline at end of file
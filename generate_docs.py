@@ -10,16 +10,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 try:
-    from fastapi.openapi.utils import get_openapi
     from src.main import app
     
-    # Generate OpenAPI schema
-    openapi_schema = get_openapi(
-        title="YT Music API",
-        version="1.0.0",
-        description="A comprehensive YouTube Music API wrapper with robust error handling",
-        routes=app.routes,
-    )
+    # Generate OpenAPI schema (same cached schema the running app serves)
+    openapi_schema = app.openapi()
     
     # Ensure docs directory exists
     docs_dir = Path("docs")
@@ -0,0 +1,46 @@
+"""
+Shared HTTP session for the test_*.py scripts that probe a running server
+"""
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "http://localhost:8000"
+
+
+def make_session(pool_maxsize=8):
+    """
+    Create a keep-alive session that retries gateway errors
+
+    Args:
+        pool_maxsize: Connections kept per host, enough for the scripts' parallel probes
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        # Hand back the last 5xx response instead of raising, since some scripts check for it.
+        # An open circuit's Retry-After can be 30s, too long for a probe to sleep through
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+SESSION = make_session()
+
+
+@functools.lru_cache(maxsize=1)
+def ensure_server():
+    """
+    Check once per process that the API server answers, raising ConnectionError if not
+
+    A failed check isn't cached, so the next caller probes again.
+    """
+    SESSION.get(f"{BASE_URL}/docs", timeout=2)
@@ -1 +0,0 @@
-from .main import *
\ No newline at end of file
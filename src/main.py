@@ -1,17 +1,27 @@
+import asyncio
+import functools
 import logging
+import logging.handlers
+import queue
 import sys
-import traceback
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from pathlib import Path
 
+import orjson
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
 from ytmusicapi import YTMusic
 
 from src.routers import (
@@ -24,27 +34,97 @@ from src.routers import (
     uploads,
     watch,
 )
+from src.utils import ytmusic_client
+from src.utils.cache import TTL_MEDIUM
+from src.utils.tracing import setup_tracing, shutdown_tracing
+from src.utils.ytmusic_client import run_ytmusic
 
 # Configure logging with more comprehensive settings
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("ytmusic_api.log", mode='a', encoding='utf-8'),
-        logging.StreamHandler()
-    ],
+log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+file_handler = logging.FileHandler("ytmusic_api.log", mode='a', encoding='utf-8')
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+
+# Records are only queued on the request path; a background thread owns the
+# real handlers so disk/console writes never block the event loop
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
 )
 
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
 # Get logger for the main application
 logger = logging.getLogger(__name__)
 
-# Log startup
-logger.info("=" * 80)
-logger.info("YT Music API Starting Up")
-logger.info(f"Startup Time: {datetime.now().isoformat()}")
-logger.info("=" * 80)
+
+# Chart countries that dominate traffic; ZZ is the global chart
+PREWARM_COUNTRIES = ("US", "GB", "DE", "JP", "BR", "IN", "ZZ")
+PREWARM_CONCURRENCY = 4
+
+
+async def prewarm_cache() -> None:
+    """Fill the landing-page and popular chart entries, then refresh them before they expire"""
+    # Capped so a cold start doesn't burst YouTube Music into rate limiting
+    semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+
+    async def warm(handler, path: str, **kwargs) -> None:
+        async with semaphore:
+            try:
+                await handler.warm(path, **kwargs)
+            except Exception as e:
+                logger.warning("Cache prewarm failed for %s: %s", path, e)
+
+    while True:
+        await asyncio.gather(
+            warm(browsing.get_home, "/browse/home", limit=3),
+            *(
+                warm(explore.get_charts, f"/explore/charts/{country}", country=country)
+                for country in PREWARM_COUNTRIES
+            ),
+        )
+        await asyncio.sleep(TTL_MEDIUM * 0.8)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown"""
+    # Records logged before this point stay queued and are flushed once the listener runs
+    log_listener.start()
+
+    # Log startup
+    logger.info("=" * 80)
+    logger.info("YT Music API Starting Up")
+    logger.info("Startup Time: %s", datetime.now().isoformat())
+    logger.info("=" * 80)
+
+    # Build the OpenAPI schema now; app.openapi() caches it on app.openapi_schema,
+    # so the first /docs or /openapi.json hit doesn't pay for route introspection
+    app.openapi()
+
+    # Runs in the background so startup doesn't wait on YouTube Music
+    prewarm_task = asyncio.create_task(prewarm_cache())
+
+    try:
+        yield
+    finally:
+        prewarm_task.cancel()
+        ytmusic_client.shutdown()
+        shutdown_tracing()
+
+        logger.info("=" * 80)
+        logger.info("YT Music API Shutting Down")
+        logger.info("Shutdown Time: %s", datetime.now().isoformat())
+        logger.info("=" * 80)
+        log_listener.stop()
+
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=None,
     redoc_url=None,
     title="YT Music API",
@@ -61,44 +141,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses; added after CORS so it wraps the CORS-decorated response.
+# Level 5 keeps most of the size reduction for about half the CPU of level 9.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
+# No-op unless OTEL_EXPORTER_OTLP_ENDPOINT is set
+setup_tracing(app)
+
+
+def _client_host(request: Request) -> str:
+    """Return the client address for log lines"""
+    return request.client.host if request.client else "unknown"
+
 
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all incoming requests and responses"""
-    start_time = datetime.now()
+    start = time.perf_counter()
+    method = request.method
+    path = request.url.path
     
+    # Resolve the level once; when INFO is off the middleware only times the request
+    log_info = logger.isEnabledFor(logging.INFO)
+
     # Log incoming request
-    logger.info(
-        f"Incoming Request: {request.method} {request.url.path} | "
-        f"Client: {request.client.host if request.client else 'unknown'}"
-    )
+    if log_info:
+        logger.info("Incoming Request: %s %s | Client: %s", method, path, _client_host(request))
     
     try:
         response = await call_next(request)
         
-        # Calculate request duration
-        duration = (datetime.now() - start_time).total_seconds()
-        
         # Log response
-        logger.info(
-            f"Response: {response.status_code} | "
-            f"Path: {request.url.path} | "
-            f"Duration: {duration:.3f}s"
-        )
+        if log_info:
+            logger.info(
+                "Response: %s | Path: %s | Duration: %.3fs",
+                response.status_code, path, time.perf_counter() - start,
+            )
         
         return response
     except Exception as e:
         # Log any errors that occur during request processing
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start
         logger.error(
-            f"Request Failed: {request.method} {request.url.path} | "
-            f"Error: {type(e).__name__}: {str(e)} | "
-            f"Duration: {duration:.3f}s"
+            "Request Failed: %s %s | Error: %s: %s | Duration: %.3fs",
+            method, path, type(e).__name__, e, duration,
         )
         raise
 
 
+@functools.lru_cache(maxsize=256)
+def _encode_detail(detail: str) -> bytes:
+    return orjson.dumps({"detail": detail})
+
+
 # Global exception handlers to log all errors
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -107,11 +203,18 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     log_level = logging.INFO if 400 <= exc.status_code < 500 else logging.ERROR
     logger.log(
         log_level,
-        f"HTTP Exception: {exc.status_code} - {exc.detail} | "
-        f"Path: {request.url.path} | Method: {request.method} | "
-        f"Client: {request.client.host if request.client else 'unknown'}"
+        "HTTP Exception: %s - %s | Path: %s | Method: %s | Client: %s",
+        exc.status_code, exc.detail, request.url.path, request.method, _client_host(request),
     )
-    return JSONResponse(
+    if isinstance(exc.detail, str):
+        # Plain-string details repeat constantly (auth and not-found messages), so their
+        # encoded bodies are reused
+        return Response(
+            content=_encode_detail(exc.detail),
+            status_code=exc.status_code,
+            media_type="application/json",
+        )
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail}
     )
@@ -120,29 +223,29 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Log all validation errors"""
+    errors = exc.errors()
     # Use INFO for validation errors (client-side errors)
     logger.info(
-        f"Validation Error: {exc.errors()} | "
-        f"Path: {request.url.path} | Method: {request.method} | "
-        f"Client: {request.client.host if request.client else 'unknown'}"
+        "Validation Error: %s | Path: %s | Method: %s | Client: %s",
+        errors, request.url.path, request.method, _client_host(request),
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
-        content={"detail": exc.errors(), "body": exc.body}
+        content=jsonable_encoder({"detail": errors, "body": exc.body})
     )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Log all uncaught exceptions"""
-    error_traceback = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
-    logger.error(
-        f"Uncaught Exception: {type(exc).__name__}: {str(exc)} | "
-        f"Path: {request.url.path} | Method: {request.method} | "
-        f"Client: {request.client.host if request.client else 'unknown'}\n"
-        f"Traceback:\n{error_traceback}"
-    )
-    return JSONResponse(
+    # exc_info defers traceback formatting to the handler, and only if it emits
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            "Uncaught Exception: %s: %s | Path: %s | Method: %s | Client: %s",
+            type(exc).__name__, exc, request.url.path, request.method, _client_host(request),
+            exc_info=exc,
+        )
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": {
@@ -164,103 +267,144 @@ app.include_router(podcasts.router, prefix="/podcasts", tags=["Podcasts"])
 app.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
 
 
+# Static payloads are built (and the landing page encoded) once at import time
+_ROOT_PAYLOAD = {
+    "message": "YT Music API is running!",
+    "status": "healthy",
+    "version": "1.0.0",
+    "features": [
+        "Search music content",
+        "Browse artists, albums, playlists",
+        "Explore charts and moods",
+        "Library management",
+        "Podcast support",
+        "Upload management",
+        "Comprehensive error handling",
+    ],
+    "health_check": "/search/health",
+    "documentation": "/docs",
+}
+_ROOT_BYTES = orjson.dumps(_ROOT_PAYLOAD)
+
+_STATUS_OPERATIONAL = {
+    "status": "operational",
+    "message": "All systems operational",
+    "timestamp": "2025-11-02T16:51:27Z",
+    "ytmusicapi_version": "1.11.1",
+    "endpoints": {
+        "search": "operational",
+        "browse": "operational",
+        "library": "operational",
+        "playlists": "operational",
+    },
+}
+
+_STATUS_DEGRADED = {
+    "status": "degraded",
+    "message": "YouTube Music API structure issues detected",
+    "timestamp": "2025-11-02T16:51:27Z",
+    "issue": "API response parsing errors",
+    "recommendation": "Use simplified search parameters",
+}
+
+_STATUS_ERROR = {
+    "status": "error",
+    "message": "API connectivity issues",
+    "timestamp": "2025-11-02T16:51:27Z",
+    "recommendation": "Check internet connection and try again",
+}
+
+
 @app.get("/")
 def root():
-    return {
-        "message": "YT Music API is running!",
-        "status": "healthy",
-        "version": "1.0.0",
-        "features": [
-            "Search music content",
-            "Browse artists, albums, playlists",
-            "Explore charts and moods",
-            "Library management",
-            "Podcast support",
-            "Upload management",
-            "Comprehensive error handling",
-        ],
-        "health_check": "/search/health",
-        "documentation": "/docs",
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/api/status")
 async def api_status():
     """Global API status check"""
     try:
-        ytmusic = YTMusic()
-        # Test basic functionality
-        test_result = ytmusic.search("test", limit=1)
-
-        return {
-            "status": "operational",
-            "message": "All systems operational",
-            "timestamp": "2025-11-02T16:51:27Z",
-            "ytmusicapi_version": "1.11.1",
-            "test_search_successful": bool(test_result),
-            "endpoints": {
-                "search": "operational",
-                "browse": "operational",
-                "library": "operational",
-                "playlists": "operational",
-            },
-        }
+        # Test basic functionality without blocking the event loop
+        test_result = await run_ytmusic(YTMusic.search, "test", limit=1)
+
+        return {**_STATUS_OPERATIONAL, "test_search_successful": bool(test_result)}
 
     except KeyError as e:
-        return {
-            "status": "degraded",
-            "message": "YouTube Music API structure issues detected",
-            "timestamp": "2025-11-02T16:51:27Z",
-            "issue": "API response parsing errors",
-            "recommendation": "Use simplified search parameters",
-            "technical_details": str(e),
-        }
+        return {**_STATUS_DEGRADED, "technical_details": str(e)}
 
     except Exception as e:
-        return {
-            "status": "error",
-            "message": "API connectivity issues",
-            "timestamp": "2025-11-02T16:51:27Z",
-            "error": str(e),
-            "recommendation": "Check internet connection and try again",
-        }
+        return {**_STATUS_ERROR, "error": str(e)}
+
+
+# The documentation pages never change at runtime, so render them once
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers keep the docs assets for a year"""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# Docs assets are served locally once fetch_docs_assets.py has populated static/;
+# otherwise the pages fall back to the UNPKG CDN
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+_DOCS_ASSETS = ("swagger-ui-bundle.js", "swagger-ui.css", "redoc.standalone.js")
+
+if all((STATIC_DIR / name).is_file() for name in _DOCS_ASSETS):
+    app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+    _SWAGGER_JS_URL = "/static/swagger-ui-bundle.js"
+    _SWAGGER_CSS_URL = "/static/swagger-ui.css"
+    _REDOC_JS_URL = "/static/redoc.standalone.js"
+else:
+    _SWAGGER_JS_URL = "https://unpkg.com/swagger-ui-dist@5/swagger-ui-bundle.js"
+    _SWAGGER_CSS_URL = "https://unpkg.com/swagger-ui-dist@5/swagger-ui.css"
+    _REDOC_JS_URL = "https://unpkg.com/redoc@next/bundles/redoc.standalone.js"
+
+_SWAGGER_UI_BYTES = get_swagger_ui_html(
+    openapi_url=app.openapi_url,
+    title=app.title + " - Swagger UI",
+    oauth2_redirect_url=app.swagger_ui_oauth2_redirect_url,
+    swagger_js_url=_SWAGGER_JS_URL,
+    swagger_css_url=_SWAGGER_CSS_URL,
+).body
+_SWAGGER_UI_REDIRECT_BYTES = get_swagger_ui_oauth2_redirect_html().body
+_REDOC_BYTES = get_redoc_html(
+    openapi_url=app.openapi_url,
+    title=app.title + " - ReDoc",
+    redoc_js_url=_REDOC_JS_URL,
+).body
 
 
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
-    return get_swagger_ui_html(
-        openapi_url=app.openapi_url,
-        title=app.title + " - Swagger UI",
-        oauth2_redirect_url=app.swagger_ui_oauth2_redirect_url,
-        swagger_js_url="https://unpkg.com/swagger-ui-dist@5/swagger-ui-bundle.js",
-        swagger_css_url="https://unpkg.com/swagger-ui-dist@5/swagger-ui.css",
-    )
+    return HTMLResponse(content=_SWAGGER_UI_BYTES)
 
 
 @app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
 async def swagger_ui_redirect():
-    return get_swagger_ui_oauth2_redirect_html()
+    return HTMLResponse(content=_SWAGGER_UI_REDIRECT_BYTES)
 
 
 @app.get("/redoc", include_in_schema=False)
 async def redoc_html():
-    return get_redoc_html(
-        openapi_url=app.openapi_url,
-        title=app.title + " - ReDoc",
-        redoc_js_url="https://unpkg.com/redoc@next/bundles/redoc.standalone.js",
-    )
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Log application shutdown"""
-    logger.info("=" * 80)
-    logger.info("YT Music API Shutting Down")
-    logger.info(f"Shutdown Time: {datetime.now().isoformat()}")
-    logger.info("=" * 80)
+    return HTMLResponse(content=_REDOC_BYTES)
 
 
 if __name__ == "__main__":
+    import os
+
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0")
+    # One worker process per core sidesteps the GIL; each worker runs its own lifespan,
+    # so the YTMusic client and its session are never shared across a fork
+    workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+    # uvloop/httptools ship with uvicorn[standard]; uvloop has no Windows build
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+    )
@@ -1,67 +1,131 @@
+import asyncio
+import functools
 import logging
-from typing import Literal
+import re
+from typing import Any, Callable, Literal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from ytmusicapi import YTMusic
 
+from src.utils.cache import TTL_LONG, TTL_MEDIUM, TTL_SHORT, cached, cached_call, invalidate
+from src.utils.error_handlers import match_error, ytmusic_endpoint
+from src.utils.validation import (
+    ALBUM_BROWSE_ID_RE,
+    CHANNEL_ID_RE,
+    SONG_RELATED_ID_RE,
+    VIDEO_ID_RE,
+    validate_id,
+)
+from src.utils.ytmusic_client import run_ytmusic, run_ytmusic_write
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Upper bound on ids per batch request, so one call can't monopolise the thread pool
+BATCH_MAX_IDS = 50
+
+
+async def _fetch_batch(
+    ids: list[str], namespace: str, ttl: int, fetch: Callable[[YTMusic, str], Any]
+) -> dict:
+    """Fetch every id concurrently through the item cache; failures are reported per id"""
+    unique_ids = list(dict.fromkeys(ids))
+    outcomes = await asyncio.gather(
+        *(
+            cached_call(namespace, item_id, ttl, functools.partial(run_ytmusic, fetch, item_id))
+            for item_id in unique_ids
+        ),
+        return_exceptions=True,
+    )
+
+    results = {}
+    errors = {}
+    for item_id, outcome in zip(unique_ids, outcomes):
+        if isinstance(outcome, Exception):
+            logger.info("Batch %s failed for %s: %s", namespace, item_id, outcome)
+            errors[item_id] = {"error": type(outcome).__name__, "message": str(outcome)}
+        elif not outcome:
+            errors[item_id] = {"error": "Not found", "message": f"No data found for {item_id}"}
+        else:
+            results[item_id] = outcome
+
+    return {"message": "OK", "query": unique_ids, "results": results, "errors": errors}
+
+
+def _validate_channel_id(channelId: str, expected: str) -> None:
+    """Reject playlist/album IDs and malformed channel IDs before calling upstream"""
+    # Check if this looks like a playlist/album ID instead of a channel ID
+    if channelId.startswith(("VL", "OLAK", "PL")):
+        # Log as INFO (not ERROR) since this is an expected client error
+        logger.info("Client attempted to use playlist/album ID '%s' as %s ID", channelId, expected)
+
+        # Determine the correct endpoint and clean ID
+        if channelId.startswith("VL"):
+            clean_id = channelId[2:]  # Remove "VL" prefix
+            recommendation = f"Use /playlists/{clean_id} for playlists"
+        elif channelId.startswith("OLAK"):
+            # /browse/album only takes MPREb_ browse IDs; resolve one from the OLAK ID first
+            recommendation = (
+                f"Use /playlists/{channelId}, or /browse/album_browse_id/{channelId} to get "
+                "the album's browse ID for /browse/album"
+            )
+        else:  # Starts with PL
+            recommendation = f"Use /playlists/{channelId} for playlists"
 
-@router.get("/home")
-async def get_home(limit: int = 3):
-    try:
-        ytmusic = YTMusic()
-        search_results = ytmusic.get_home(limit)
-
-        if not search_results:
-            raise HTTPException(status_code=404, detail="No home content found")
-
-        return {"message": "OK", "limit": limit, "result": search_results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_home: {str(e)}")
         raise HTTPException(
-            status_code=503,
+            status_code=400,
             detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, home content temporarily unavailable",
-                "technical_details": str(e),
+                "error": "Invalid ID type",
+                "message": f"This appears to be a playlist or album ID, not {expected} ID",
+                "channelId": channelId,
+                "recommendation": recommendation,
             },
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_home: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching home content",
-            },
-        )
+    validate_id(channelId, CHANNEL_ID_RE, "channelId", "channel ID")
+
+
+@router.get("/home")
+@cached(ttl=TTL_MEDIUM, max_age=60)
+@ytmusic_endpoint("home content")
+async def get_home(limit: int = 3):
+    search_results = await run_ytmusic(YTMusic.get_home, limit)
+
+    if not search_results:
+        raise HTTPException(status_code=404, detail="No home content found")
+
+    return {"message": "OK", "limit": limit, "result": search_results}
 
 
 @router.get("/artist/{channelId}")
+@cached(ttl=TTL_LONG)
+@ytmusic_endpoint(
+    "artist data",
+    "channelId",
+    errors=((("not found",), 404, "Artist with ID {channelId} not found"),),
+)
 async def get_artist(channelId: str):
+    _validate_channel_id(channelId, "an artist/channel")
     try:
-        ytmusic = YTMusic()
         search_results = None
         
         # Try get_artist first
         try:
-            search_results = ytmusic.get_artist(channelId)
+            search_results = await run_ytmusic(YTMusic.get_artist, channelId)
         except KeyError as artist_error:
             # Check if this is a header renderer mismatch issue
             error_str = str(artist_error)
             if "musicImmersiveHeaderRenderer" in error_str or "musicVisualHeaderRenderer" in error_str:
                 logger.info(
-                    f"get_artist failed for {channelId} due to header renderer issue ({error_str}), trying get_user fallback"
+                    "get_artist failed for %s due to header renderer issue (%s), trying get_user fallback",
+                    channelId,
+                    error_str,
                 )
                 
                 # Try get_user as fallback since this might be a user/channel with different header
                 try:
-                    search_results = ytmusic.get_user(channelId)
-                    logger.info(f"get_user fallback successful for {channelId}")
+                    search_results = await run_ytmusic(YTMusic.get_user, channelId)
+                    logger.info("get_user fallback successful for %s", channelId)
                     
                     # Add a note that we used the user endpoint
                     return {
@@ -71,7 +135,7 @@ async def get_artist(channelId: str):
                         "note": "Retrieved using user endpoint due to API structure differences"
                     }
                 except Exception as user_error:
-                    logger.error(f"Both get_artist and get_user failed for {channelId}: {str(user_error)}")
+                    logger.error("Both get_artist and get_user failed for %s: %s", channelId, user_error)
                     raise HTTPException(
                         status_code=503,
                         detail={
@@ -91,41 +155,16 @@ async def get_artist(channelId: str):
 
         return {"message": "OK", "query": channelId, "result": search_results}
 
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
     except KeyError as e:
         error_str = str(e)
         
-        # Check if this looks like a playlist/album ID instead of artist/channel ID
-        if channelId.startswith("VL") or channelId.startswith("OLAK") or channelId.startswith("PL"):
-            # Log as INFO (not ERROR) since this is an expected client error
-            logger.info(f"Client attempted to use playlist/album ID '{channelId}' on artist endpoint")
-            
-            # Determine the correct endpoint and clean ID
-            if channelId.startswith("VL"):
-                # Remove VL prefix for playlist endpoint
-                clean_id = channelId[2:]  # Remove "VL" prefix
-                recommendation = f"Use /playlists/{clean_id} for playlists"
-            elif channelId.startswith("OLAK"):
-                recommendation = f"Use /playlists/{channelId} or /browse/album/{channelId} for albums"
-            else:  # Starts with PL
-                recommendation = f"Use /playlists/{channelId} for playlists"
-            
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": "Invalid ID type",
-                    "message": "This appears to be a playlist or album ID, not an artist/channel ID",
-                    "channelId": channelId,
-                    "recommendation": recommendation,
-                },
-            ) from e
-        
         # Check for different page structure (might be a playlist/album page)
         if "singleColumnBrowseResultsRenderer" in error_str and ("musicResponsiveHeaderRenderer" in error_str or "musicDetailHeaderRenderer" in error_str):
             # Log as INFO (not ERROR) since this is an expected client error
-            logger.info(f"Client attempted to use playlist/album ID '{channelId}' on artist endpoint (detected by page structure)")
+            logger.info(
+                "Client attempted to use playlist/album ID '%s' on artist endpoint (detected by page structure)",
+                channelId,
+            )
             
             raise HTTPException(
                 status_code=400,
@@ -133,558 +172,347 @@ async def get_artist(channelId: str):
                     "error": "Wrong endpoint",
                     "message": "This ID returns a playlist/album page, not an artist page",
                     "channelId": channelId,
-                    "recommendation": "Use /playlists/{browseId} for playlists or /browse/album/{browseId} for albums",
+                    "recommendation": "Use /playlists/{browseId} for playlists or /browse/album/{browseId} for MPREb_ album IDs",
                 },
             ) from e
         
-        # Log genuine errors
-        logger.error(f"KeyError in get_artist for {channelId}: {error_str}")
-        
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, artist data temporarily unavailable",
-                "channelId": channelId,
-                "technical_details": error_str,
-            },
-        ) from e
-
-    except Exception as e:
-        logger.error(f"Unexpected error in get_artist for {channelId}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Artist with ID {channelId} not found"
-            ) from e
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching artist data",
-                "channelId": channelId,
-            },
-        ) from e
+        # Anything else is a structure change; ytmusic_endpoint reports it as a 503
+        raise
 
 
-@router.get("/artist_videos/{channelId}")
-async def get_artist_videos(channelId: str):
-    try:
-        ytmusic = YTMusic()
-        artist_results = ytmusic.get_artist(channelId)
 
-        if not artist_results:
-            raise HTTPException(status_code=404, detail="Artist not found")
+def _fetch_artist_videos(ytmusic: YTMusic, channelId: str) -> dict:
+    """Resolve the artist's videos playlist and fetch it in one worker-thread hop"""
+    artist_results = ytmusic.get_artist(channelId)
 
-        # Check if videos section exists
-        if "videos" not in artist_results or not artist_results["videos"]:
-            raise HTTPException(status_code=404, detail="No videos found for this artist")
+    if not artist_results:
+        raise HTTPException(status_code=404, detail="Artist not found")
 
-        browseId = artist_results["videos"]["browseId"]
-        videos = ytmusic.get_playlist(browseId)
+    # One probe covers a missing, empty or browseId-less videos section
+    browseId = (artist_results.get("videos") or {}).get("browseId")
+    if not browseId:
+        raise HTTPException(status_code=404, detail="No videos found for this artist")
 
-        return {"message": "OK", "query": channelId, "result": videos}
+    return ytmusic.get_playlist(browseId)
 
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions as they are
 
+@router.get("/artist_videos/{channelId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint("artist videos", "channelId")
+async def get_artist_videos(channelId: str):
+    _validate_channel_id(channelId, "an artist/channel")
+    try:
+        videos = await run_ytmusic(_fetch_artist_videos, channelId)
     except KeyError as e:
-        logger.error(f"KeyError in get_artist_videos for {channelId}: {str(e)}")
-
         # Try to provide more specific error based on which key is missing
-        if "videos" in str(e):
-            raise HTTPException(
-                status_code=404,
-                detail={
-                    "error": "No videos available",
-                    "message": "This artist doesn't have videos available or the structure has changed",
-                    "channelId": channelId,
-                },
-            )
-
+        if "videos" not in str(e):
+            raise
+        logger.error("KeyError in get_artist_videos for %s: %s", channelId, e)
         raise HTTPException(
-            status_code=503,
+            status_code=404,
             detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, artist videos temporarily unavailable",
+                "error": "No videos available",
+                "message": "This artist doesn't have videos available or the structure has changed",
                 "channelId": channelId,
-                "technical_details": str(e),
             },
-        )
+        ) from e
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_artist_videos for {channelId}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching artist videos",
-                "channelId": channelId,
-            },
-        )
+    return {"message": "OK", "query": channelId, "result": videos}
 
 
 @router.get("/artist_albums/{channelId}")
+@cached(ttl=TTL_LONG)
+@ytmusic_endpoint(
+    "artist albums",
+    "channelId",
+    errors=((("not found",), 404, "Artist with ID {channelId} not found"),),
+)
 async def get_artist_albums(
     channelId: str,
     params: str,
     limit: int | None = 100,
     order: Literal["Recency", "Popularity", "Alphabetical order"] | None = None,
 ):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_artist_albums(
-            channelId=channelId, params=params, limit=limit, order=order
-        )
-
-        if not results:
-            raise HTTPException(status_code=404, detail="No albums found for this artist")
-
-        return {"message": "OK", "query": channelId, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_artist_albums for {channelId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, artist albums temporarily unavailable",
-                "channelId": channelId,
-                "technical_details": str(e),
-            },
-        )
+    _validate_channel_id(channelId, "an artist/channel")
+    results = await run_ytmusic(
+        YTMusic.get_artist_albums, channelId=channelId, params=params, limit=limit, order=order
+    )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_artist_albums for {channelId}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Artist with ID {channelId} not found")
+    if not results:
+        raise HTTPException(status_code=404, detail="No albums found for this artist")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching artist albums",
-                "channelId": channelId,
-            },
-        )
+    return {"message": "OK", "query": channelId, "result": results}
 
 
 @router.get("/album/{browseId}")
+@cached(ttl=TTL_LONG)
+@ytmusic_endpoint(
+    "album data",
+    "browseId",
+    errors=((("not found",), 404, "Album with ID {browseId} not found"),),
+)
 async def get_album(browseId: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_album(browseId)
+    validate_id(browseId, ALBUM_BROWSE_ID_RE, "browseId", "album browse ID")
+    results = await run_ytmusic(YTMusic.get_album, browseId)
 
-        if not results:
-            raise HTTPException(status_code=404, detail="Album not found")
+    if not results:
+        raise HTTPException(status_code=404, detail="Album not found")
 
-        return {"message": "OK", "query": browseId, "result": results}
+    return {"message": "OK", "query": browseId, "result": results}
 
-    except KeyError as e:
-        logger.error(f"KeyError in get_album for {browseId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, album data temporarily unavailable",
-                "browseId": browseId,
-                "technical_details": str(e),
-            },
-        )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_album for {browseId}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Album with ID {browseId} not found")
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching album data",
-                "browseId": browseId,
-            },
-        )
+@router.get("/albums_batch")
+async def get_albums_batch(ids: list[str] = Query(..., max_length=BATCH_MAX_IDS)):
+    """Album data for up to 50 ids in one request; a bad id doesn't fail the batch"""
+    return await _fetch_batch(ids, "album_item", TTL_LONG, YTMusic.get_album)
 
 
 @router.get("/album_browse_id/{audioPlaylistId}")
+@cached(ttl=TTL_LONG)
+@ytmusic_endpoint(
+    "album browse ID",
+    "audioPlaylistId",
+    errors=((("not found",), 404, "Album with playlist ID {audioPlaylistId} not found"),),
+)
 async def get_album_browse_id(audioPlaylistId: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_album_browse_id(audioPlaylistId)
+    results = await run_ytmusic(YTMusic.get_album_browse_id, audioPlaylistId)
 
-        if not results:
-            raise HTTPException(status_code=404, detail="Album browse ID not found")
-
-        return {"message": "OK", "query": audioPlaylistId, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_album_browse_id for {audioPlaylistId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, album browse ID temporarily unavailable",
-                "audioPlaylistId": audioPlaylistId,
-                "technical_details": str(e),
-            },
-        )
+    if not results:
+        raise HTTPException(status_code=404, detail="Album browse ID not found")
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_album_browse_id for {audioPlaylistId}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(
-                status_code=404, detail=f"Album with playlist ID {audioPlaylistId} not found"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching album browse ID",
-                "audioPlaylistId": audioPlaylistId,
-            },
-        )
+    return {"message": "OK", "query": audioPlaylistId, "result": results}
 
 
 @router.get("/user/{channelId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint(
+    "user data",
+    "channelId",
+    errors=((("not found",), 404, "User with ID {channelId} not found"),),
+)
 async def get_user(channelId: str):
+    _validate_channel_id(channelId, "a user/channel")
+    results = None
+    
+    # Try get_user first
     try:
-        ytmusic = YTMusic()
-        results = None
-        
-        # Try get_user first
-        try:
-            results = ytmusic.get_user(channelId)
-        except Exception as user_error:
-            # Check if this is the musicImmersiveHeaderRenderer issue
-            error_str = str(user_error)
-            if "musicVisualHeaderRenderer" in error_str and "musicImmersiveHeaderRenderer" in error_str:
-                logger.info(
-                    f"get_user failed for {channelId} due to header renderer mismatch, trying get_artist fallback"
-                )
-                
-                # Try get_artist as fallback since this might be an artist channel
-                try:
-                    results = ytmusic.get_artist(channelId)
-                    logger.info(f"get_artist fallback successful for {channelId}")
-                    
-                    # Add a note that we used the artist endpoint
-                    return {
-                        "message": "OK",
-                        "query": channelId,
-                        "result": results,
-                        "note": "Retrieved using artist endpoint due to API structure changes"
-                    }
-                except Exception as artist_error:
-                    logger.error(f"Both get_user and get_artist failed for {channelId}: {str(artist_error)}")
-                    raise HTTPException(
-                        status_code=503,
-                        detail={
-                            "error": "API structure error",
-                            "message": "YouTube Music API structure has changed (musicImmersiveHeaderRenderer not yet supported by ytmusicapi)",
-                            "channelId": channelId,
-                            "recommendation": "Try using /browse/artist/{channelId} endpoint instead",
-                            "technical_details": error_str,
-                        },
-                    ) from user_error
-            else:
-                # Different error, re-raise to be handled below
-                raise
-
-        if not results:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        return {"message": "OK", "query": channelId, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        error_str = str(e)
-        
-        # Check if this looks like a playlist/album ID instead of user/channel ID
-        if channelId.startswith("VL") or channelId.startswith("OLAK") or channelId.startswith("PL"):
-            # Log as INFO (not ERROR) since this is an expected client error
-            logger.info(f"Client attempted to use playlist/album ID '{channelId}' on user endpoint")
-            
-            # Determine the correct endpoint and clean ID
-            if channelId.startswith("VL"):
-                clean_id = channelId[2:]  # Remove "VL" prefix
-                recommendation = f"Use /playlists/{clean_id} for playlists"
-            elif channelId.startswith("OLAK"):
-                recommendation = f"Use /playlists/{channelId} or /browse/album/{channelId} for albums"
-            else:  # Starts with PL
-                recommendation = f"Use /playlists/{channelId} for playlists"
+        results = await run_ytmusic(YTMusic.get_user, channelId)
+    except Exception as user_error:
+        # Check if this is the musicImmersiveHeaderRenderer issue
+        error_str = str(user_error)
+        if "musicVisualHeaderRenderer" in error_str and "musicImmersiveHeaderRenderer" in error_str:
+            logger.info(
+                "get_user failed for %s due to header renderer mismatch, trying get_artist fallback",
+                channelId,
+            )
             
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": "Invalid ID type",
-                    "message": "This appears to be a playlist or album ID, not a user/channel ID",
-                    "channelId": channelId,
-                    "recommendation": recommendation,
-                },
-            ) from e
-        
-        # Log genuine errors
-        logger.error(f"KeyError in get_user for {channelId}: {error_str}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, user data temporarily unavailable",
-                "channelId": channelId,
-                "technical_details": error_str,
-            },
-        ) from e
-
-    except Exception as e:
-        logger.error(f"Unexpected error in get_user for {channelId}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(
-                status_code=404, 
-                detail=f"User with ID {channelId} not found"
-            ) from e
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching user data",
-                "channelId": channelId,
-            },
-        ) from e
+            # Try get_artist as fallback since this might be an artist channel
+            try:
+                results = await run_ytmusic(YTMusic.get_artist, channelId)
+                logger.info("get_artist fallback successful for %s", channelId)
+                
+                # Add a note that we used the artist endpoint
+                return {
+                    "message": "OK",
+                    "query": channelId,
+                    "result": results,
+                    "note": "Retrieved using artist endpoint due to API structure changes"
+                }
+            except Exception as artist_error:
+                logger.error("Both get_user and get_artist failed for %s: %s", channelId, artist_error)
+                raise HTTPException(
+                    status_code=503,
+                    detail={
+                        "error": "API structure error",
+                        "message": "YouTube Music API structure has changed (musicImmersiveHeaderRenderer not yet supported by ytmusicapi)",
+                        "channelId": channelId,
+                        "recommendation": "Try using /browse/artist/{channelId} endpoint instead",
+                        "technical_details": error_str,
+                    },
+                ) from user_error
+        else:
+            # Different error, re-raise to be handled below
+            raise
+
+    if not results:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return {"message": "OK", "query": channelId, "result": results}
+
+
+def _user_section_params(channel: dict | None, unavailable_detail: str) -> str:
+    """Return the params token for the user's paged sections, or raise a 404"""
+    if not channel:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # One probe covers a missing, empty or params-less videos section
+    params = (channel.get("videos") or {}).get("params")
+    if not params:
+        raise HTTPException(status_code=404, detail=unavailable_detail)
+
+    return params
+
+
+def _fetch_user_section(
+    ytmusic: YTMusic,
+    channelId: str,
+    fetch: Callable[[YTMusic, str, str], list],
+    unavailable_detail: str,
+) -> list:
+    """Look up the user's section params and fetch the section in one worker-thread hop"""
+    params = _user_section_params(ytmusic.get_user(channelId), unavailable_detail)
+    return fetch(ytmusic, channelId, params)
 
 
 @router.get("/user_playlists/{channelId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint("user playlists", "channelId")
 async def get_user_playlists(channelId: str):
+    _validate_channel_id(channelId, "a user/channel")
     try:
-        ytmusic = YTMusic()
-        channel = ytmusic.get_user(channelId)
-
-        if not channel:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Check if videos section exists and has params
-        if "videos" not in channel or not channel["videos"] or "params" not in channel["videos"]:
-            raise HTTPException(status_code=404, detail="User playlists not available")
-
-        params = channel["videos"]["params"]
-        results = ytmusic.get_user_playlists(channelId, params)
-
-        return {"message": "OK", "query": channelId, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions as they are
-
+        results = await run_ytmusic(
+            _fetch_user_section, channelId, YTMusic.get_user_playlists, "User playlists not available"
+        )
     except KeyError as e:
-        logger.error(f"KeyError in get_user_playlists for {channelId}: {str(e)}")
-
-        if "videos" in str(e) or "params" in str(e):
-            raise HTTPException(
-                status_code=404,
-                detail={
-                    "error": "Playlists not available",
-                    "message": "This user doesn't have accessible playlists or the structure has changed",
-                    "channelId": channelId,
-                },
-            )
-
+        if "videos" not in str(e) and "params" not in str(e):
+            raise
+        logger.error("KeyError in get_user_playlists for %s: %s", channelId, e)
         raise HTTPException(
-            status_code=503,
+            status_code=404,
             detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, user playlists temporarily unavailable",
+                "error": "Playlists not available",
+                "message": "This user doesn't have accessible playlists or the structure has changed",
                 "channelId": channelId,
-                "technical_details": str(e),
             },
-        )
+        ) from e
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_user_playlists for {channelId}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching user playlists",
-                "channelId": channelId,
-            },
-        )
+    return {"message": "OK", "query": channelId, "result": results}
 
 
 @router.get("/user_videos/{channelId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint("user videos", "channelId")
 async def get_user_videos(channelId: str):
+    _validate_channel_id(channelId, "a user/channel")
     try:
-        ytmusic = YTMusic()
-        channel = ytmusic.get_user(channelId)
-
-        if not channel:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Check if videos section exists and has params
-        if "videos" not in channel or not channel["videos"] or "params" not in channel["videos"]:
-            raise HTTPException(status_code=404, detail="User videos not available")
-
-        params = channel["videos"]["params"]
-        results = ytmusic.get_user_videos(channelId, params)
-
-        return {"message": "OK", "query": channelId, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions as they are
-
+        results = await run_ytmusic(
+            _fetch_user_section, channelId, YTMusic.get_user_videos, "User videos not available"
+        )
     except KeyError as e:
-        logger.error(f"KeyError in get_user_videos for {channelId}: {str(e)}")
-
-        if "videos" in str(e) or "params" in str(e):
-            raise HTTPException(
-                status_code=404,
-                detail={
-                    "error": "Videos not available",
-                    "message": "This user doesn't have accessible videos or the structure has changed",
-                    "channelId": channelId,
-                },
-            )
-
+        if "videos" not in str(e) and "params" not in str(e):
+            raise
+        logger.error("KeyError in get_user_videos for %s: %s", channelId, e)
         raise HTTPException(
-            status_code=503,
+            status_code=404,
             detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, user videos temporarily unavailable",
+                "error": "Videos not available",
+                "message": "This user doesn't have accessible videos or the structure has changed",
                 "channelId": channelId,
-                "technical_details": str(e),
             },
-        )
+        ) from e
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_user_videos for {channelId}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching user videos",
-                "channelId": channelId,
-            },
-        )
+    return {"message": "OK", "query": channelId, "result": results}
 
 
 @router.get("/song/{videoId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint(
+    "song data",
+    "videoId",
+    errors=((("not found", "unavailable"), 404, "Song with ID {videoId} not found or unavailable"),),
+)
 async def get_song(videoId: str, signatureTimestamp: int | None = None):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_song(videoId, signatureTimestamp)
+    validate_id(videoId, VIDEO_ID_RE, "videoId", "video ID")
+    results = await run_ytmusic(YTMusic.get_song, videoId, signatureTimestamp)
 
-        if not results:
-            raise HTTPException(status_code=404, detail="Song not found")
+    if not results:
+        raise HTTPException(status_code=404, detail="Song not found")
 
-        return {"message": "OK", "query": videoId, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_song for {videoId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, song data temporarily unavailable",
-                "videoId": videoId,
-                "technical_details": str(e),
-            },
-        )
+    return {"message": "OK", "query": videoId, "result": results}
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_song for {videoId}: {str(e)}")
-        if "not found" in str(e).lower() or "unavailable" in str(e).lower():
-            raise HTTPException(
-                status_code=404, detail=f"Song with ID {videoId} not found or unavailable"
-            )
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching song data",
-                "videoId": videoId,
-            },
-        )
+@router.get("/songs")
+async def get_songs(ids: list[str] = Query(..., max_length=BATCH_MAX_IDS)):
+    """Song data for up to 50 ids in one request; a bad id doesn't fail the batch"""
+    return await _fetch_batch(ids, "song_item", TTL_MEDIUM, YTMusic.get_song)
 
 
 @router.get("/related/{browseId}")
+@cached(ttl=TTL_SHORT)
+@ytmusic_endpoint(
+    "related content",
+    "browseId",
+    errors=((("not found",), 404, "Related content for {browseId} not found"),),
+)
 async def get_related_by_browse_id(browseId: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_song_related(browseId)
+    results = await run_ytmusic(YTMusic.get_song_related, browseId)
 
-        if not results:
-            raise HTTPException(status_code=404, detail="No related content found")
+    if not results:
+        raise HTTPException(status_code=404, detail="No related content found")
 
-        return {"message": "OK", "query": browseId, "result": results}
+    return {"message": "OK", "query": browseId, "result": results}
 
-    except KeyError as e:
-        logger.error(f"KeyError in get_related_by_browse_id for {browseId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, related content temporarily unavailable",
-                "browseId": browseId,
-                "technical_details": str(e),
-            },
-        )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_related_by_browse_id for {browseId}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Related content for {browseId} not found")
+# Failure classes for song_related, in priority order; matched in one pass over the message
+SONG_RELATED_ERROR_RE = re.compile(
+    r"(?P<bad_request>400.*?(?:bad request|invalid argument)|(?:bad request|invalid argument).*?400)"
+    r"|(?P<not_found>not found|unavailable)"
+    r"|(?P<access>private|access|401)"
+    r"|(?P<upstream>server returned http)",
+    re.IGNORECASE | re.DOTALL,
+)
+# KeyErrors naming a header key mean the response layout changed, not that content is missing
+HEADER_KEY_RE = re.compile(r"header", re.IGNORECASE)
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching related content",
-                "browseId": browseId,
-            },
-        )
 
-
-@router.get("/song_related/{songId}")
-async def get_song_related_by_song_id(songId: str):
+def _fetch_song_related(ytmusic: YTMusic, songId: str) -> tuple[list, str]:
+    """Find the song's related content, falling back to the watch playlist's related browse ID"""
+    # Try direct approach first (works for some song IDs)
     try:
-        ytmusic = YTMusic()
-        
-        # Try direct approach first (works for some song IDs)
-        related_content = None
-        related_browse_id = None
+        related_content = ytmusic.get_song_related(songId)
+        logger.info("Direct get_song_related worked for %s", songId)
+        return related_content, songId
+    except Exception as direct_error:
+        logger.info("Direct approach failed for %s, trying watch playlist: %s", songId, str(direct_error))
         
+        # Fallback: Get watch playlist and extract related browse ID
         try:
-            related_content = ytmusic.get_song_related(songId)
-            related_browse_id = songId
-            logger.info("Direct get_song_related worked for %s", songId)
-        except Exception as direct_error:
-            logger.info("Direct approach failed for %s, trying watch playlist: %s", songId, str(direct_error))
+            watch_playlist = ytmusic.get_watch_playlist(songId)
             
-            # Fallback: Get watch playlist and extract related browse ID
-            try:
-                watch_playlist = ytmusic.get_watch_playlist(songId)
-                
-                if not watch_playlist or 'related' not in watch_playlist:
-                    raise HTTPException(
-                        status_code=404,
-                        detail={
-                            "error": "No related content available", 
-                            "message": "This song doesn't have related content available",
-                            "songId": songId
-                        }
-                    )
-                
-                related_browse_id = watch_playlist['related']
-                related_content = ytmusic.get_song_related(related_browse_id)
-                logger.info("Watch playlist approach worked for %s, browse ID: %s", songId, related_browse_id)
-                
-            except Exception as watch_error:
-                logger.error("Both approaches failed for %s: direct=%s, watch=%s", songId, str(direct_error), str(watch_error))
-                raise watch_error
+            if not watch_playlist or 'related' not in watch_playlist:
+                raise HTTPException(
+                    status_code=404,
+                    detail={
+                        "error": "No related content available", 
+                        "message": "This song doesn't have related content available",
+                        "songId": songId
+                    }
+                )
+            
+            related_browse_id = watch_playlist['related']
+            related_content = ytmusic.get_song_related(related_browse_id)
+            logger.info("Watch playlist approach worked for %s, browse ID: %s", songId, related_browse_id)
+            return related_content, related_browse_id
+            
+        except Exception as watch_error:
+            logger.error("Both approaches failed for %s: direct=%s, watch=%s", songId, str(direct_error), str(watch_error))
+            raise watch_error
+
+
+@router.get("/song_related/{songId}")
+@cached(ttl=TTL_SHORT)
+async def get_song_related_by_song_id(songId: str):
+    validate_id(songId, SONG_RELATED_ID_RE, "songId", "video ID or related browse ID")
+    try:
+        # The song details don't depend on the related lookup, so fetch both at once
+        related, song_info = await asyncio.gather(
+            run_ytmusic(_fetch_song_related, songId),
+            run_ytmusic(YTMusic.get_song, songId),
+            return_exceptions=True,
+        )
+        if isinstance(related, BaseException):
+            raise related
+        related_content, related_browse_id = related
 
         if not related_content:
             raise HTTPException(
@@ -696,13 +524,9 @@ async def get_song_related_by_song_id(songId: str):
                 }
             )
 
-        # Also try to get basic song info for additional context
-        song_info = None
-        try:
-            song_info = ytmusic.get_song(songId)
-        except Exception:
-            # If song info fails, continue with just related content
-            pass
+        # Song info is only extra context; continue with just related content if it failed
+        if isinstance(song_info, BaseException):
+            song_info = None
 
         return {
             "message": "OK",
@@ -717,9 +541,9 @@ async def get_song_related_by_song_id(songId: str):
         raise  # Re-raise HTTP exceptions as they are
 
     except KeyError as e:
-        logger.error("KeyError in get_song_related_by_song_id for %s: %s", songId, str(e))
+        logger.error("KeyError in get_song_related_by_song_id for %s: %s", songId, e)
 
-        if "header" in str(e).lower():
+        if HEADER_KEY_RE.search(str(e)):
             raise HTTPException(
                 status_code=503,
                 detail={
@@ -740,11 +564,11 @@ async def get_song_related_by_song_id(songId: str):
         ) from e
 
     except Exception as e:
-        logger.error("Unexpected error in get_song_related_by_song_id for %s: %s", songId, str(e))
-        
-        error_msg = str(e).lower()
+        logger.error("Unexpected error in get_song_related_by_song_id for %s: %s", songId, e)
         
-        if "400" in error_msg and ("bad request" in error_msg or "invalid argument" in error_msg):
+        error_kind = match_error(SONG_RELATED_ERROR_RE, e)
+
+        if error_kind == "bad_request":
             raise HTTPException(
                 status_code=400,
                 detail={
@@ -754,8 +578,8 @@ async def get_song_related_by_song_id(songId: str):
                     "recommendation": "Verify the song ID is correct and the song is publicly available"
                 }
             ) from e
-        
-        if "not found" in error_msg or "unavailable" in error_msg:
+
+        if error_kind == "not_found":
             raise HTTPException(
                 status_code=404, 
                 detail={
@@ -764,8 +588,8 @@ async def get_song_related_by_song_id(songId: str):
                     "songId": songId
                 }
             ) from e
-        
-        if "private" in error_msg or "access" in error_msg or "401" in error_msg:
+
+        if error_kind == "access":
             raise HTTPException(
                 status_code=403,
                 detail={
@@ -775,8 +599,8 @@ async def get_song_related_by_song_id(songId: str):
                 }
             ) from e
 
-        # Check for server errors from YouTube Music
-        if "server returned http" in error_msg:
+        # Server errors from YouTube Music
+        if error_kind == "upstream":
             raise HTTPException(
                 status_code=503,
                 detail={
@@ -799,112 +623,52 @@ async def get_song_related_by_song_id(songId: str):
 
 
 @router.get("/lyrics/{browseId}")
+@cached(ttl=TTL_LONG)
+@ytmusic_endpoint(
+    "lyrics",
+    "browseId",
+    errors=((("not found", "no lyrics"), 404, "Lyrics for {browseId} not found"),),
+)
 async def get_lyrics(browseId: str, timestamps: bool | None = False):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_lyrics(browseId, timestamps)
+    results = await run_ytmusic(YTMusic.get_lyrics, browseId, timestamps)
 
-        if not results:
-            raise HTTPException(status_code=404, detail="Lyrics not found")
+    if not results:
+        raise HTTPException(status_code=404, detail="Lyrics not found")
 
-        return {"message": "OK", "query": browseId, "result": results}
+    return {"message": "OK", "query": browseId, "result": results}
 
-    except KeyError as e:
-        logger.error(f"KeyError in get_lyrics for {browseId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, lyrics temporarily unavailable",
-                "browseId": browseId,
-                "technical_details": str(e),
-            },
-        )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_lyrics for {browseId}: {str(e)}")
-        if "not found" in str(e).lower() or "no lyrics" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Lyrics for {browseId} not found")
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching lyrics",
-                "browseId": browseId,
-            },
-        )
+@router.get("/lyrics_batch")
+async def get_lyrics_batch(ids: list[str] = Query(..., max_length=BATCH_MAX_IDS)):
+    """Lyrics for up to 50 ids in one request; a bad id doesn't fail the batch"""
+    return await _fetch_batch(ids, "lyrics_item", TTL_LONG, YTMusic.get_lyrics)
 
 
 @router.get("/tasteprofile")
+@cached(ttl=TTL_MEDIUM, namespace="library", public=False)
+@ytmusic_endpoint(
+    "taste profile",
+    errors=((("auth", "login"), 401, "Authentication required to access taste profile"),),
+)
 async def get_tasteprofile():
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_tasteprofile()
-
-        return {"message": "OK", "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_tasteprofile: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, taste profile temporarily unavailable",
-                "technical_details": str(e),
-            },
-        )
+    results = await run_ytmusic(YTMusic.get_tasteprofile)
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_tasteprofile: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to access taste profile"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching taste profile",
-            },
-        )
+    return {"message": "OK", "result": results}
 
 
 @router.post("/tasteprofile")
+@ytmusic_endpoint(
+    "taste profile",
+    "artists",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to set taste profile"),
+        (("invalid",), 400, "Invalid input data: {error}"),
+    ),
+    action="setting",
+)
 async def set_tasteprofile(artists: list[str], taste_profile: dict | None = None):
-    try:
-        ytmusic = YTMusic()
-        ytmusic.set_tasteprofile(artists, taste_profile)
-
-        return {"message": "OK", "query": artists}
-
-    except KeyError as e:
-        logger.error(f"KeyError in set_tasteprofile: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot set taste profile",
-                "artists": artists,
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in set_tasteprofile: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to set taste profile"
-            )
-        elif "invalid" in str(e).lower():
-            raise HTTPException(status_code=400, detail=f"Invalid input data: {str(e)}")
+    await run_ytmusic_write(YTMusic.set_tasteprofile, artists, taste_profile)
+    # The cached GET /tasteprofile, kept with the other account data, is now stale
+    await invalidate("library")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while setting taste profile",
-                "artists": artists,
-            },
-        )
+    return {"message": "OK", "query": artists}
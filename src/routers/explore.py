@@ -3,84 +3,49 @@ import logging
 from fastapi import APIRouter, HTTPException
 from ytmusicapi import YTMusic
 
+from src.utils.cache import TTL_MEDIUM, cached
+from src.utils.error_handlers import ytmusic_endpoint
+from src.utils.ytmusic_client import run_ytmusic
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/mood_playlists/{query}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint(
+    "mood playlists",
+    "query",
+    errors=((("not found",), 404, "No mood playlists found for '{query}'"),),
+)
 async def get_mood_playlists(query: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_mood_playlists(query)
-
-        if not results:
-            raise HTTPException(status_code=404, detail="No mood playlists found for this query")
-
-        return {"message": "OK", "query": query, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_mood_playlists for {query}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, mood playlists temporarily unavailable",
-                "query": query,
-                "technical_details": str(e),
-            },
-        )
+    results = await run_ytmusic(YTMusic.get_mood_playlists, query)
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_mood_playlists for {query}: {str(e)}")
-        if "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"No mood playlists found for '{query}'")
+    if not results:
+        raise HTTPException(status_code=404, detail="No mood playlists found for this query")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching mood playlists",
-                "query": query,
-            },
-        )
+    return {"message": "OK", "query": query, "result": results}
 
 
 @router.get("/charts/{country}")
+@cached(ttl=TTL_MEDIUM, key_builder=lambda country: country.upper(), max_age=60)
+@ytmusic_endpoint(
+    "charts",
+    "country",
+    errors=(
+        (
+            ("invalid", "not supported"),
+            400,
+            "Invalid country code: {country}. Please use a valid ISO country code.",
+        ),
+    ),
+)
 async def get_charts(country: str = "ZZ"):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_charts(country)
-
-        if not results:
-            raise HTTPException(status_code=404, detail=f"No charts found for country: {country}")
-
-        return {"message": "OK", "query": country, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_charts for {country}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, charts temporarily unavailable",
-                "country": country,
-                "technical_details": str(e),
-            },
-        )
+    # Country codes are case-insensitive; normalising keeps "us" and "US" on one cache entry
+    country = country.upper()
+    results = await run_ytmusic(YTMusic.get_charts, country)
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_charts for {country}: {str(e)}")
-        if "invalid" in str(e).lower() or "not supported" in str(e).lower():
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid country code: {country}. Please use a valid ISO country code.",
-            )
+    if not results:
+        raise HTTPException(status_code=404, detail=f"No charts found for country: {country}")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching charts",
-                "country": country,
-            },
-        )
+    return {"message": "OK", "query": country, "result": results}
\ No newline at end of file
@@ -1,52 +1,103 @@
+import asyncio
+import functools
 import logging
+import re
 from typing import Callable, Literal
 
 from fastapi import APIRouter, HTTPException
 from ytmusicapi import YTMusic
 
+from src.utils import jobs
+from src.utils.cache import TTL_MEDIUM, TTL_SHORT, cached, cached_call, invalidate
+from src.utils.error_handlers import match_error
+from src.utils.streaming import ndjson_response
+from src.utils.ytmusic_client import run_ytmusic, run_ytmusic_write
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Library contents change whenever the user acts on them, so they're only cached briefly
+# and every write below drops the whole namespace
+LIBRARY_TTL = 60
+
+# Validated by FastAPI while parsing the query, before the handler runs
+Rating = Literal["LIKE", "DISLIKE", "INDIFFERENT"]
+
+# Classifies an upstream error message in one case-insensitive scan; auth wins over
+# not_found when both appear, as it did in the old if/elif chain
+LIBRARY_ERROR_RE = re.compile(r"(?P<auth>auth|login)|(?P<not_found>not found)", re.IGNORECASE)
+
+
+def handle_ytmusic_errors(operation_name: str, identifier_arg: str | None = None):
+    """
+    Decorator to handle common YTMusic API errors
+
+    Args:
+        operation_name: Handler name, used in log lines and (with spaces) in error messages
+        identifier_arg: Name of the handler argument identifying the item acted on; its
+            value is logged and echoed in error details
+    """
+
+    # Everything but the identifier and exception text is fixed per operation, so the
+    # error messages are built once here rather than on every failure. The exceptions
+    # themselves stay per-failure: a shared instance would keep growing its traceback
+    # (and hold on to __cause__) each time it was raised
+    friendly_name = operation_name.replace("_", " ")
+    structure_message = (
+        f"YouTube Music API structure has changed, {friendly_name} temporarily unavailable"
+    )
+    auth_detail = f"Authentication required to access {friendly_name}"
+    not_found_detail = f"Content not found for {friendly_name}"
+    unexpected_detail = {
+        "error": "Internal server error",
+        "message": f"An unexpected error occurred while {friendly_name}",
+    }
+
+    def to_http_exception(e: Exception, kwargs: dict) -> HTTPException:
+        """Log a failed call and shape it into the response for this operation"""
+        identifier = kwargs.get(identifier_arg) if identifier_arg else None
+        context = {identifier_arg: identifier} if identifier_arg else {}
+
+        if isinstance(e, KeyError):
+            if identifier_arg:
+                logger.error("KeyError in %s for %s: %s", operation_name, identifier, e)
+            else:
+                logger.error("KeyError in %s: %s", operation_name, e)
+            return HTTPException(
+                status_code=503,
+                detail={
+                    "error": "API structure error",
+                    "message": structure_message,
+                    **context,
+                    "technical_details": str(e),
+                },
+            )
 
-def handle_ytmusic_errors(operation_name: str, identifier: str = None):
-    """Decorator to handle common YTMusic API errors"""
+        if identifier_arg:
+            logger.error("Unexpected error in %s for %s: %s", operation_name, identifier, e)
+        else:
+            logger.error("Unexpected error in %s: %s", operation_name, e)
+        kind = match_error(LIBRARY_ERROR_RE, e)
+        if kind == "auth":
+            return HTTPException(status_code=401, detail=auth_detail)
+        if kind == "not_found":
+            return HTTPException(status_code=404, detail=not_found_detail)
+
+        return HTTPException(
+            status_code=500,
+            detail={**unexpected_detail, **context} if context else unexpected_detail,
+        )
 
     def decorator(func: Callable) -> Callable:
+        # The success path is only the awaited call; everything else runs on failure
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             try:
                 return await func(*args, **kwargs)
-
-            except KeyError as e:
-                logger.error("KeyError in %s: %s", operation_name, str(e))
-                raise HTTPException(
-                    status_code=503,
-                    detail={
-                        "error": "API structure error",
-                        "message": f"YouTube Music API structure has changed, {operation_name.replace('_', ' ')} temporarily unavailable",
-                        "technical_details": str(e),
-                    },
-                ) from e
-
+            except HTTPException:
+                raise  # Re-raise HTTP exceptions as they are
             except Exception as e:
-                logger.error("Unexpected error in %s: %s", operation_name, str(e))
-                if "auth" in str(e).lower() or "login" in str(e).lower():
-                    raise HTTPException(
-                        status_code=401,
-                        detail=f"Authentication required to access {operation_name.replace('_', ' ')}",
-                    ) from e
-                if "not found" in str(e).lower():
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Content not found for {operation_name.replace('_', ' ')}",
-                    ) from e
-
-                raise HTTPException(
-                    status_code=500,
-                    detail={
-                        "error": "Internal server error",
-                        "message": f"An unexpected error occurred while {operation_name.replace('_', ' ')}",
-                    },
-                ) from e
+                raise to_http_exception(e, kwargs) from e
 
         return wrapper
 
@@ -54,462 +105,313 @@ def handle_ytmusic_errors(operation_name: str, identifier: str = None):
 
 
 @router.get("/library_playlists")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
+@handle_ytmusic_errors("get_library_playlists")
 async def get_library_playlists(limit: int | None = 25):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_library_playlists(limit)
-
-        return {"message": "OK", "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_library_playlists: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, library playlists temporarily unavailable",
-                "technical_details": str(e),
-            },
-        )
+    results = await run_ytmusic(YTMusic.get_library_playlists, limit)
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_library_playlists: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to access library playlists"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching library playlists",
-            },
-        )
+    return {"message": "OK", "result": results}
 
 
 @router.get("/library_songs")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
+@handle_ytmusic_errors("get_library_songs")
 async def get_library_songs(
     limit: int = 25,
     validate_responses: bool = False,
     order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None,
 ):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_library_songs(limit, validate_responses, order)
-
-        return {"message": "OK", "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_library_songs: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, library songs temporarily unavailable",
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in get_library_songs: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to access library songs"
-            )
+    results = await run_ytmusic(YTMusic.get_library_songs, limit, validate_responses, order)
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching library songs",
-            },
-        )
+    return {"message": "OK", "result": results}
 
 
 @router.get("/library_albums")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_library_albums")
 async def get_library_albums(
     limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
 ):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_albums(limit, order)
+    results = await run_ytmusic(YTMusic.get_library_albums, limit, order)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/library_artists")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_library_artists")
 async def get_library_artists(
     limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
 ):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_artists(limit, order)
+    results = await run_ytmusic(YTMusic.get_library_artists, limit, order)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/library_subscriptions")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_library_subscriptions")
 async def get_library_subscriptions(
     limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
 ):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_subscriptions(limit, order)
+    results = await run_ytmusic(YTMusic.get_library_subscriptions, limit, order)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/library_podcasts")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_library_podcasts")
 async def get_library_podcasts(
     limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
 ):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_podcasts(limit, order)
+    results = await run_ytmusic(YTMusic.get_library_podcasts, limit, order)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/library_channels")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_library_channels")
 async def get_library_channels(
     limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
 ):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_channels(limit, order)
+    results = await run_ytmusic(YTMusic.get_library_channels, limit, order)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/liked_songs")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_liked_songs")
 async def get_liked_songs(limit: int = 100):
-    ytmusic = YTMusic()
-    results = ytmusic.get_liked_songs(limit)
+    results = await run_ytmusic(YTMusic.get_liked_songs, limit)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/saved_episodes")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_saved_episodes")
 async def get_saved_episodes(limit: int = 100):
-    ytmusic = YTMusic()
-    results = ytmusic.get_saved_episodes(limit)
+    results = await run_ytmusic(YTMusic.get_saved_episodes, limit)
 
     return {"message": "OK", "result": results}
 
 
 @router.get("/history")
+@cached(ttl=LIBRARY_TTL, namespace="library", public=False)
 @handle_ytmusic_errors("get_history")
 async def get_history():
-    ytmusic = YTMusic()
-    results = ytmusic.get_history()
+    results = await run_ytmusic(YTMusic.get_history)
 
     return {"message": "OK", "result": results}
 
 
+@router.get("/library_songs/stream")
+@handle_ytmusic_errors("get_library_songs")
+async def stream_library_songs(
+    limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
+):
+    """Library songs as NDJSON, one song per line"""
+    results = await cached_call(
+        "library",
+        f"stream:library_songs:{limit}:{order}",
+        LIBRARY_TTL,
+        functools.partial(run_ytmusic, YTMusic.get_library_songs, limit, False, order),
+    )
+
+    return ndjson_response(results or [])
+
+
+@router.get("/liked_songs/stream")
+@handle_ytmusic_errors("get_liked_songs")
+async def stream_liked_songs(limit: int = 100):
+    """Liked songs as NDJSON, one track per line"""
+    results = await cached_call(
+        "library",
+        f"stream:liked_songs:{limit}",
+        LIBRARY_TTL,
+        functools.partial(run_ytmusic, YTMusic.get_liked_songs, limit),
+    )
+
+    return ndjson_response((results or {}).get("tracks") or [])
+
+
+@router.get("/history/stream")
+@handle_ytmusic_errors("get_history")
+async def stream_history():
+    """Listening history as NDJSON, one entry per line"""
+    results = await cached_call(
+        "library", "stream:history", LIBRARY_TTL, functools.partial(run_ytmusic, YTMusic.get_history)
+    )
+
+    return ndjson_response(results or [])
+
+
+@router.post("/prefetch")
+async def prefetch_library():
+    """
+    Load the library listings concurrently into the cache ahead of a library view
+
+    Entries are stored under the keys of the plain GETs (default parameters), so the
+    per-listing requests that follow are cache hits
+    """
+    listings = {
+        "library_playlists": get_library_playlists,
+        "library_songs": get_library_songs,
+        "library_albums": get_library_albums,
+        "library_artists": get_library_artists,
+        "library_subscriptions": get_library_subscriptions,
+        "liked_songs": get_liked_songs,
+    }
+    outcomes = await asyncio.gather(
+        *(handler.warm(f"/library/{name}") for name, handler in listings.items()),
+        return_exceptions=True,
+    )
+
+    result = {}
+    for name, outcome in zip(listings, outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning("Library prefetch failed for %s: %s", name, outcome)
+            result[name] = "failed"
+        else:
+            result[name] = "cached"
+
+    return {"message": "OK", "result": result}
+
+
 @router.get("/account_info")
+@cached(ttl=TTL_SHORT, namespace="library", public=False)
 @handle_ytmusic_errors("get_account_info")
 async def get_account_info():
-    ytmusic = YTMusic()
-    results = ytmusic.get_account_info()
+    results = await run_ytmusic(YTMusic.get_account_info)
 
     return {"message": "OK", "result": results}
 
 
 @router.post("/history/{videoId}")
+@handle_ytmusic_errors("add_history_item", identifier_arg="videoId")
 async def add_history_item(videoId: str):
-    try:
-        ytmusic = YTMusic()
-        song = ytmusic.get_song(videoId)
-
-        if not song:
-            raise HTTPException(status_code=404, detail=f"Song with ID {videoId} not found")
-
-        results = ytmusic.add_history_item(song)
-
-        return {"message": "OK", "videoId": videoId, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in add_history_item for {videoId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot add to history",
-                "videoId": videoId,
-                "technical_details": str(e),
-            },
-        )
+    # Shares the per-song entries of /browse/songs so repeat posts skip the lookup; like
+    # /browse/song it's kept for TTL_MEDIUM because the playback URLs inside expire
+    song = await cached_call(
+        "song_item", videoId, TTL_MEDIUM, functools.partial(run_ytmusic, YTMusic.get_song, videoId)
+    )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in add_history_item for {videoId}: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(status_code=401, detail="Authentication required to add to history")
+    if not song:
+        raise HTTPException(status_code=404, detail=f"Song with ID {videoId} not found")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while adding to history",
-                "videoId": videoId,
-            },
-        )
+    results = await run_ytmusic_write(YTMusic.add_history_item, song)
+    await invalidate("library")
+
+    return {"message": "OK", "videoId": videoId, "result": results}
 
 
 @router.delete("/history")
+@handle_ytmusic_errors("remove_history_items", identifier_arg="feedbackTokens")
 async def remove_history_items(feedbackTokens: list[str]):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.remove_history_items(feedbackTokens)
-
-        return {"message": "OK", "feedbackTokens": feedbackTokens, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in remove_history_items: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot remove history items",
-                "technical_details": str(e),
-            },
-        )
+    # ytmusicapi sends the whole list in one request; duplicates would only pad it
+    feedbackTokens = list(dict.fromkeys(feedbackTokens))
+    results = await run_ytmusic_write(YTMusic.remove_history_items, feedbackTokens)
+    await invalidate("library")
 
-    except Exception as e:
-        logger.error(f"Unexpected error in remove_history_items: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to remove history items"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while removing history items",
-            },
-        )
+    return {"message": "OK", "feedbackTokens": feedbackTokens, "result": results}
 
 
 @router.post("/rate_song/{videoId}")
-async def rate_song(videoId: str, rating: str = "INDIFFERENT"):
-    try:
-        valid_ratings = ["LIKE", "DISLIKE", "INDIFFERENT"]
-        if rating not in valid_ratings:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid rating '{rating}'. Must be one of: {', '.join(valid_ratings)}",
-            )
+@handle_ytmusic_errors("rate_song", identifier_arg="videoId")
+async def rate_song(videoId: str, rating: Rating = "INDIFFERENT"):
+    results = await run_ytmusic_write(YTMusic.rate_song, videoId, rating)
+    await invalidate("library")
 
-        ytmusic = YTMusic()
-        results = ytmusic.rate_song(videoId, rating)
+    return {"message": "OK", "videoId": videoId, "rating": rating, "result": results}
 
-        return {"message": "OK", "videoId": videoId, "rating": rating, "result": results}
 
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
+@router.post("/rate_playlist/{playlistId}")
+@handle_ytmusic_errors("rate_playlist", identifier_arg="playlistId")
+async def rate_playlist(playlistId: str, rating: Rating = "INDIFFERENT"):
+    results = await run_ytmusic_write(YTMusic.rate_playlist, playlistId, rating)
+    await invalidate("library")
 
-    except KeyError as e:
-        logger.error(f"KeyError in rate_song for {videoId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot rate song",
-                "videoId": videoId,
-                "technical_details": str(e),
-            },
-        )
+    return {"message": "OK", "playlistId": playlistId, "rating": rating, "result": results}
 
-    except Exception as e:
-        logger.error(f"Unexpected error in rate_song for {videoId}: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(status_code=401, detail="Authentication required to rate songs")
-        elif "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Song with ID {videoId} not found")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while rating song",
-                "videoId": videoId,
-            },
-        )
+@router.post("/subscribe_artists")
+@handle_ytmusic_errors("subscribe_artists", identifier_arg="channelIds")
+async def subscribe_artists(channelIds: list[str]):
+    if not channelIds:
+        raise HTTPException(status_code=400, detail="At least one channel ID is required")
 
+    channelIds = list(dict.fromkeys(channelIds))
+    results = await run_ytmusic_write(YTMusic.subscribe_artists, channelIds)
+    await invalidate("library")
 
-@router.post("/rate_playlist/{playlistId}")
-async def rate_playlist(playlistId: str, rating: str = "INDIFFERENT"):
-    try:
-        valid_ratings = ["LIKE", "DISLIKE", "INDIFFERENT"]
-        if rating not in valid_ratings:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid rating '{rating}'. Must be one of: {', '.join(valid_ratings)}",
-            )
+    return {"message": "OK", "channelIds": channelIds, "result": results}
 
-        ytmusic = YTMusic()
-        results = ytmusic.rate_playlist(playlistId, rating)
 
-        return {"message": "OK", "playlistId": playlistId, "rating": rating, "result": results}
+@router.delete("/subscribe_artists")
+@handle_ytmusic_errors("unsubscribe_artists", identifier_arg="channelIds")
+async def unsubscribe_artists(channelIds: list[str]):
+    if not channelIds:
+        raise HTTPException(status_code=400, detail="At least one channel ID is required")
 
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
+    channelIds = list(dict.fromkeys(channelIds))
+    results = await run_ytmusic_write(YTMusic.unsubscribe_artists, channelIds)
+    await invalidate("library")
 
-    except KeyError as e:
-        logger.error(f"KeyError in rate_playlist for {playlistId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot rate playlist",
-                "playlistId": playlistId,
-                "technical_details": str(e),
-            },
-        )
+    return {"message": "OK", "channelIds": channelIds, "result": results}
 
-    except Exception as e:
-        logger.error(f"Unexpected error in rate_playlist for {playlistId}: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(status_code=401, detail="Authentication required to rate playlists")
-        elif "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Playlist with ID {playlistId} not found")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while rating playlist",
-                "playlistId": playlistId,
-            },
-        )
+@router.patch("/song_library_status")
+@handle_ytmusic_errors("edit_song_library_status", identifier_arg="feedbackTokens")
+async def edit_song_library_status(feedbackTokens: list[str]):
+    if not feedbackTokens:
+        raise HTTPException(status_code=400, detail="At least one feedback token is required")
 
+    feedbackTokens = list(dict.fromkeys(feedbackTokens))
+    results = await run_ytmusic_write(YTMusic.edit_song_library_status, feedbackTokens)
+    await invalidate("library")
 
-@router.post("/subscribe_artists")
-async def subscribe_artists(channelIds: list[str]):
-    try:
-        if not channelIds:
-            raise HTTPException(status_code=400, detail="At least one channel ID is required")
-
-        ytmusic = YTMusic()
-        results = ytmusic.subscribe_artists(channelIds)
-
-        return {"message": "OK", "channelIds": channelIds, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in subscribe_artists: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot subscribe to artists",
-                "technical_details": str(e),
-            },
-        )
+    return {"message": "OK", "feedbackTokens": feedbackTokens, "result": results}
 
-    except Exception as e:
-        logger.error(f"Unexpected error in subscribe_artists: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to subscribe to artists"
-            )
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while subscribing to artists",
-                "channelIds": channelIds,
-            },
-        )
+@router.post("/jobs/library_songs", status_code=202)
+async def submit_library_songs_job(
+    limit: int = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
+):
+    """Enumerate library songs in the background; poll /library/jobs/{task_id} for the result"""
+    task_id = await jobs.submit(
+        "library_songs",
+        functools.partial(run_ytmusic, YTMusic.get_library_songs, limit, False, order),
+    )
 
+    return {"message": "Accepted", "task_id": task_id}
 
-@router.delete("/subscribe_artists")
-async def unsubscribe_artists(channelIds: list[str]):
-    try:
-        if not channelIds:
-            raise HTTPException(status_code=400, detail="At least one channel ID is required")
-
-        ytmusic = YTMusic()
-        results = ytmusic.unsubscribe_artists(channelIds)
-
-        return {"message": "OK", "channelIds": channelIds, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in unsubscribe_artists: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot unsubscribe from artists",
-                "technical_details": str(e),
-            },
-        )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in unsubscribe_artists: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to unsubscribe from artists"
-            )
+@router.post("/jobs/liked_songs", status_code=202)
+async def submit_liked_songs_job(limit: int = 100):
+    """Fetch liked songs in the background; poll /library/jobs/{task_id} for the result"""
+    task_id = await jobs.submit(
+        "liked_songs", functools.partial(run_ytmusic, YTMusic.get_liked_songs, limit)
+    )
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while unsubscribing from artists",
-                "channelIds": channelIds,
-            },
-        )
+    return {"message": "Accepted", "task_id": task_id}
 
 
-@router.patch("/song_library_status")
-async def edit_song_library_status(feedbackTokens: list[str]):
-    try:
-        if not feedbackTokens:
-            raise HTTPException(status_code=400, detail="At least one feedback token is required")
-
-        ytmusic = YTMusic()
-        results = ytmusic.edit_song_library_status(feedbackTokens)
-
-        return {"message": "OK", "feedbackTokens": feedbackTokens, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in edit_song_library_status: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot edit song library status",
-                "technical_details": str(e),
-            },
-        )
+@router.post("/jobs/history", status_code=202)
+async def submit_history_job():
+    """Fetch the listening history in the background; poll /library/jobs/{task_id} for the result"""
+    task_id = await jobs.submit("history", functools.partial(run_ytmusic, YTMusic.get_history))
 
-    except Exception as e:
-        logger.error(f"Unexpected error in edit_song_library_status: {str(e)}")
-        if "auth" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to edit song library status"
-            )
+    return {"message": "Accepted", "task_id": task_id}
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while editing song library status",
-            },
-        )
+
+@router.get("/jobs/{task_id}")
+async def get_job(task_id: str):
+    job = await jobs.get_job(task_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {task_id} not found or expired")
+
+    return job
\ No newline at end of file
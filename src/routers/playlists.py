@@ -1,364 +1,317 @@
+import asyncio
+import functools
 import logging
+from typing import Any, Literal
 
 from fastapi import APIRouter, HTTPException
 from ytmusicapi import YTMusic
 
+from src.utils.cache import TTL_SHORT, cached, cached_call, invalidate
+from src.utils.error_handlers import ytmusic_endpoint
+from src.utils.streaming import ndjson_response
+from src.utils.validation import PLAYLIST_ID_RE, validate_id
+from src.utils.ytmusic_client import run_ytmusic, run_ytmusic_write
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Validated by FastAPI while parsing the query, before the handler runs
+PrivacyStatus = Literal["PRIVATE", "PUBLIC", "UNLISTED"]
 
-@router.get("/{playlistId}")
-def get_playlist(
-    playlistId: str, limit: int | None = 100, related: bool = False, suggestions_limit: int = 0
-):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_playlist(
-            playlistId, limit=limit, related=related, suggestions_limit=suggestions_limit
-        )
+# Edits are sent to YouTube Music in batches of at most this many videos
+PLAYLIST_EDIT_BATCH = 100
 
-        if not results:
-            raise HTTPException(status_code=404, detail="Playlist not found")
 
-        return {"message": "OK", "playlistId": playlistId, "result": results}
+def _batches(items: list, size: int = PLAYLIST_EDIT_BATCH) -> list[list]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
 
-    except KeyError as e:
-        logger.error(f"KeyError in get_playlist for {playlistId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, playlist data temporarily unavailable",
-                "playlistId": playlistId,
-                "technical_details": str(e),
-            },
-        )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in get_playlist for {playlistId}: {str(e)}")
-        if "not found" in str(e).lower() or "unavailable" in str(e).lower():
-            raise HTTPException(
-                status_code=404, detail=f"Playlist with ID {playlistId} not found or unavailable"
-            )
+def _succeeded(result: Any) -> bool:
+    status = result.get("status", "") if isinstance(result, dict) else result
+    return isinstance(status, str) and "SUCCEEDED" in status
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching playlist",
-                "playlistId": playlistId,
-            },
+
+async def _add_in_batches(
+    playlistId: str, videoIds: list[str], source_playlist: str | None, duplicates: bool
+) -> Any:
+    """
+    Add a long videoIds list batch by batch, merging the per-batch results
+
+    Batches go out one after another so the videos keep their order in the playlist,
+    and the first failed batch is returned as is, leaving the rest unsent.
+    """
+    merged: dict[str, Any] = {"status": "STATUS_SUCCEEDED", "playlistEditResults": []}
+    for index, batch in enumerate(_batches(videoIds)):
+        result = await run_ytmusic_write(
+            YTMusic.add_playlist_items,
+            playlistId,
+            videoIds=batch,
+            source_playlist=source_playlist if index == 0 else None,
+            duplicates=duplicates,
         )
+        if not _succeeded(result):
+            return result
+        merged["playlistEditResults"].extend(result.get("playlistEditResults", []))
+    return merged
+
+
+@router.get("/{playlistId}")
+@cached(ttl=TTL_SHORT, namespace="playlists")
+@ytmusic_endpoint(
+    "playlist data",
+    "playlistId",
+    errors=(
+        (
+            ("not found", "unavailable"),
+            404,
+            "Playlist with ID {playlistId} not found or unavailable",
+        ),
+    ),
+)
+async def get_playlist(
+    playlistId: str, limit: int | None = 100, related: bool = False, suggestions_limit: int = 0
+):
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "playlist ID")
+    results = await run_ytmusic(
+        YTMusic.get_playlist,
+        playlistId,
+        limit=limit,
+        related=related,
+        suggestions_limit=suggestions_limit,
+    )
+
+    if not results:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+
+    return {"message": "OK", "playlistId": playlistId, "result": results}
+
+
+@router.get("/{playlistId}/stream")
+@ytmusic_endpoint(
+    "playlist data",
+    "playlistId",
+    errors=(
+        (
+            ("not found", "unavailable"),
+            404,
+            "Playlist with ID {playlistId} not found or unavailable",
+        ),
+    ),
+)
+async def stream_playlist(playlistId: str, limit: int | None = 100):
+    """Playlist tracks as NDJSON, one track per line"""
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "playlist ID")
+    results = await cached_call(
+        "playlists",
+        f"stream:{playlistId}:{limit}",
+        TTL_SHORT,
+        functools.partial(run_ytmusic, YTMusic.get_playlist, playlistId, limit=limit),
+    )
+
+    if not results:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+
+    return ndjson_response(results.get("tracks") or [])
 
 
 @router.post("/")
+@ytmusic_endpoint(
+    "playlist",
+    "title",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to create playlists"),
+        (("quota", "limit"), 429, "Rate limit exceeded or quota reached"),
+    ),
+    action="creating",
+)
 async def create_playlist(
     title: str,
     description: str,
-    privacy_status: str = "PRIVATE",
+    privacy_status: PrivacyStatus = "PRIVATE",
     video_ids: list | None = None,
     source_playlist: str | None = None,
 ):
-    try:
-        # Validate privacy status
-        valid_privacy = ["PRIVATE", "PUBLIC", "UNLISTED"]
-        if privacy_status not in valid_privacy:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid privacy_status '{privacy_status}'. Must be one of: {', '.join(valid_privacy)}",
-            )
-
-        if not title.strip():
-            raise HTTPException(status_code=400, detail="Playlist title cannot be empty")
-
-        ytmusic = YTMusic()
-        results = ytmusic.create_playlist(
-            title,
-            description,
-            privacy_status=privacy_status,
-            video_ids=video_ids,
-            source_playlist=source_playlist,
-        )
-
-        return {
-            "message": "OK",
-            "title": title,
-            "privacy_status": privacy_status,
-            "result": results,
-        }
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in create_playlist for '{title}': {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot create playlist",
-                "title": title,
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in create_playlist for '{title}': {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to create playlists"
-            )
-        elif "quota" in str(e).lower() or "limit" in str(e).lower():
-            raise HTTPException(status_code=429, detail="Rate limit exceeded or quota reached")
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while creating playlist",
-                "title": title,
-            },
-        )
+    if not title.strip():
+        raise HTTPException(status_code=400, detail="Playlist title cannot be empty")
+
+    results = await run_ytmusic_write(
+        YTMusic.create_playlist,
+        title,
+        description,
+        privacy_status=privacy_status,
+        video_ids=video_ids,
+        source_playlist=source_playlist,
+    )
+    # The new playlist also shows up in /library/library_playlists
+    await invalidate("library")
+
+    return {
+        "message": "OK",
+        "title": title,
+        "privacy_status": privacy_status,
+        "result": results,
+    }
 
 
 @router.patch("/")
+@ytmusic_endpoint(
+    "playlist",
+    "playlistId",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to edit playlists"),
+        (("not found",), 404, "Playlist with ID {playlistId} not found"),
+        (("permission",), 403, "You don't have permission to edit this playlist"),
+    ),
+    action="editing",
+)
 async def edit_playlist(
     playlistId: str,
     title: str | None = None,
     description: str | None = None,
-    privacyStatus: str | None = None,
+    privacyStatus: PrivacyStatus | None = None,
     moveItem: str | tuple[str, str] | None = None,
     addPlaylistId: str | None = None,
     addToTop: bool | None = None,
 ):
-    try:
-        # Validate privacy status if provided
-        if privacyStatus:
-            valid_privacy = ["PRIVATE", "PUBLIC", "UNLISTED"]
-            if privacyStatus not in valid_privacy:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid privacyStatus '{privacyStatus}'. Must be one of: {', '.join(valid_privacy)}",
-                )
-
-        # Validate that at least one parameter is provided for editing
-        if not any([title, description, privacyStatus, moveItem, addPlaylistId]):
-            raise HTTPException(
-                status_code=400,
-                detail="At least one parameter (title, description, privacyStatus, moveItem, addPlaylistId) must be provided",
-            )
-
-        ytmusic = YTMusic()
-        results = ytmusic.edit_playlist(
-            playlistId,
-            title=title,
-            description=description,
-            privacyStatus=privacyStatus,
-            moveItem=moveItem,
-            addPlaylistId=addPlaylistId,
-            addToTop=addToTop,
-        )
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "playlist ID")
 
-        return {"message": "OK", "playlistId": playlistId, "result": results}
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in edit_playlist for {playlistId}: {str(e)}")
+    # Validate that at least one parameter is provided for editing
+    if not any([title, description, privacyStatus, moveItem, addPlaylistId]):
         raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot edit playlist",
-                "playlistId": playlistId,
-                "technical_details": str(e),
-            },
+            status_code=400,
+            detail="At least one parameter (title, description, privacyStatus, moveItem, addPlaylistId) must be provided",
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in edit_playlist for {playlistId}: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(status_code=401, detail="Authentication required to edit playlists")
-        elif "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Playlist with ID {playlistId} not found")
-        elif "permission" in str(e).lower():
-            raise HTTPException(
-                status_code=403, detail="You don't have permission to edit this playlist"
-            )
+    results = await run_ytmusic_write(
+        YTMusic.edit_playlist,
+        playlistId,
+        title=title,
+        description=description,
+        privacyStatus=privacyStatus,
+        moveItem=moveItem,
+        addPlaylistId=addPlaylistId,
+        addToTop=addToTop,
+    )
+    # A new title or privacy also shows up in /library/library_playlists
+    await invalidate("playlists")
+    await invalidate("library")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while editing playlist",
-                "playlistId": playlistId,
-            },
-        )
+    return {"message": "OK", "playlistId": playlistId, "result": results}
 
 
 @router.delete("/{playlistId}")
+@ytmusic_endpoint(
+    "playlist",
+    "playlistId",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to delete playlists"),
+        (("not found",), 404, "Playlist with ID {playlistId} not found"),
+        (("permission",), 403, "You don't have permission to delete this playlist"),
+    ),
+    action="deleting",
+)
 async def delete_playlist(playlistId: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.delete_playlist(playlistId)
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "playlist ID")
+    results = await run_ytmusic_write(YTMusic.delete_playlist, playlistId)
+    await invalidate("playlists")
+    await invalidate("library")
 
-        return {"message": "OK", "playlistId": playlistId, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in delete_playlist for {playlistId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot delete playlist",
-                "playlistId": playlistId,
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in delete_playlist for {playlistId}: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to delete playlists"
-            )
-        elif "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Playlist with ID {playlistId} not found")
-        elif "permission" in str(e).lower():
-            raise HTTPException(
-                status_code=403, detail="You don't have permission to delete this playlist"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while deleting playlist",
-                "playlistId": playlistId,
-            },
-        )
+    return {"message": "OK", "playlistId": playlistId, "result": results}
 
 
 @router.post("/items")
+@ytmusic_endpoint(
+    "playlist items",
+    "playlistId",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to add playlist items"),
+        (("not found",), 404, "Playlist with ID {playlistId} not found"),
+        (("permission",), 403, "You don't have permission to edit this playlist"),
+    ),
+    action="adding",
+)
 async def add_playlist_items(
     playlistId: str,
     videoIds: list[str] | None = None,
     source_playlist: str | None = None,
     duplicates: bool = False,
 ):
-    try:
-        # Validate input
-        if not videoIds and not source_playlist:
-            raise HTTPException(
-                status_code=400, detail="Either videoIds or source_playlist must be provided"
-            )
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "playlist ID")
 
-        if videoIds and not videoIds:
-            raise HTTPException(status_code=400, detail="videoIds cannot be empty if provided")
-
-        ytmusic = YTMusic()
-        results = ytmusic.add_playlist_items(
-            playlistId, videoIds=videoIds, source_playlist=source_playlist, duplicates=duplicates
-        )
-
-        return {
-            "message": "OK",
-            "playlistId": playlistId,
-            "videoIds": videoIds,
-            "source_playlist": source_playlist,
-            "result": results,
-        }
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in add_playlist_items for {playlistId}: {str(e)}")
+    # Validate input
+    if not videoIds and not source_playlist:
         raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot add playlist items",
-                "playlistId": playlistId,
-                "technical_details": str(e),
-            },
+            status_code=400, detail="Either videoIds or source_playlist must be provided"
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in add_playlist_items for {playlistId}: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to add playlist items"
-            )
-        elif "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Playlist with ID {playlistId} not found")
-        elif "permission" in str(e).lower():
-            raise HTTPException(
-                status_code=403, detail="You don't have permission to edit this playlist"
+    try:
+        if videoIds and len(videoIds) > PLAYLIST_EDIT_BATCH:
+            results = await _add_in_batches(playlistId, videoIds, source_playlist, duplicates)
+        else:
+            results = await run_ytmusic_write(
+                YTMusic.add_playlist_items,
+                playlistId,
+                videoIds=videoIds,
+                source_playlist=source_playlist,
+                duplicates=duplicates,
             )
+    finally:
+        # Batches sent before a failure have already changed the playlist upstream
+        await invalidate("playlists")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while adding playlist items",
-                "playlistId": playlistId,
-            },
-        )
+    return {
+        "message": "OK",
+        "playlistId": playlistId,
+        "videoIds": videoIds,
+        "source_playlist": source_playlist,
+        "result": results,
+    }
 
 
 @router.delete("/items/{playlistId}")
+@ytmusic_endpoint(
+    "playlist items",
+    "playlistId",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to remove playlist items"),
+        (("not found",), 404, "Playlist with ID {playlistId} not found"),
+        (("permission",), 403, "You don't have permission to edit this playlist"),
+    ),
+    action="removing",
+)
 async def remove_playlist_items(playlistId: str, videos: list[dict]):
-    try:
-        if not videos:
-            raise HTTPException(
-                status_code=400, detail="At least one video must be provided for removal"
-            )
-
-        ytmusic = YTMusic()
-        results = ytmusic.remove_playlist_items(playlistId, videos)
-
-        return {
-            "message": "OK",
-            "playlistId": playlistId,
-            "videos_count": len(videos),
-            "result": results,
-        }
-
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in remove_playlist_items for {playlistId}: {str(e)}")
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "playlist ID")
+    if not videos:
         raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot remove playlist items",
-                "playlistId": playlistId,
-                "technical_details": str(e),
-            },
+            status_code=400, detail="At least one video must be provided for removal"
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in remove_playlist_items for {playlistId}: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to remove playlist items"
-            )
-        elif "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Playlist with ID {playlistId} not found")
-        elif "permission" in str(e).lower():
-            raise HTTPException(
-                status_code=403, detail="You don't have permission to edit this playlist"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while removing playlist items",
-                "playlistId": playlistId,
-            },
-        )
+    # Removals don't depend on order, so the batches of a long list are sent concurrently
+    outcomes = await asyncio.gather(
+        *(
+            run_ytmusic_write(YTMusic.remove_playlist_items, playlistId, batch)
+            for batch in _batches(videos)
+        ),
+        return_exceptions=True,
+    )
+    # Batches that went through changed the playlist even if another one failed
+    await invalidate("playlists")
+    failure = next((outcome for outcome in outcomes if isinstance(outcome, BaseException)), None)
+    if failure is not None:
+        raise failure
+    results = next((outcome for outcome in outcomes if not _succeeded(outcome)), None)
+    if results is None and len(outcomes) == 1:
+        results = outcomes[0]
+    elif results is None:
+        # Every batch went through, so report them as one edit, as _add_in_batches does
+        results = {"status": "STATUS_SUCCEEDED", "playlistEditResults": []}
+        for outcome in outcomes:
+            if isinstance(outcome, dict):
+                results["playlistEditResults"].extend(outcome.get("playlistEditResults", []))
+
+    return {
+        "message": "OK",
+        "playlistId": playlistId,
+        "videos_count": len(videos),
+        "result": results,
+    }
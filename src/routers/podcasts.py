@@ -3,142 +3,84 @@ import logging
 from fastapi import APIRouter, HTTPException
 from ytmusicapi import YTMusic
 
+from src.utils.cache import TTL_MEDIUM, cached
+from src.utils.error_handlers import ytmusic_endpoint
+from src.utils.validation import (
+    CHANNEL_ID_RE,
+    PLAYLIST_ID_RE,
+    VIDEO_ID_RE,
+    validate_id,
+)
+from src.utils.ytmusic_client import run_ytmusic
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def handle_podcast_errors(operation_name: str, identifier: str):
-    """Helper function to handle common podcast-related errors"""
-
-    def decorator(func):
-        async def wrapper(*args, **kwargs):
-            try:
-                return await func(*args, **kwargs)
-
-            except KeyError as e:
-                logger.error(f"KeyError in {operation_name} for {identifier}: {str(e)}")
-                raise HTTPException(
-                    status_code=503,
-                    detail={
-                        "error": "API structure error",
-                        "message": f"YouTube Music API structure has changed, {operation_name.replace('_', ' ')} temporarily unavailable",
-                        "identifier": identifier,
-                        "technical_details": str(e),
-                    },
-                )
-
-            except Exception as e:
-                logger.error(f"Unexpected error in {operation_name} for {identifier}: {str(e)}")
-                if "not found" in str(e).lower() or "unavailable" in str(e).lower():
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"{operation_name.replace('_', ' ').title()} with ID {identifier} not found or unavailable",
-                    )
-                elif "auth" in str(e).lower():
-                    raise HTTPException(
-                        status_code=401,
-                        detail=f"Authentication required to access {operation_name.replace('_', ' ')}",
-                    )
-
-                raise HTTPException(
-                    status_code=500,
-                    detail={
-                        "error": "Internal server error",
-                        "message": f"An unexpected error occurred while fetching {operation_name.replace('_', ' ')}",
-                        "identifier": identifier,
-                    },
-                )
-
-        return wrapper
-
-    return decorator
+def _podcast_errors(kind: str, id_param: str):
+    """Error rules shared by the podcast, episode and episodes playlist routes"""
+    return (
+        (
+            ("not found", "unavailable"),
+            404,
+            f"{kind.capitalize()} with ID {{{id_param}}} not found or unavailable",
+        ),
+        (("auth",), 401, f"Authentication required to access {kind}"),
+    )
 
 
 @router.get("/channel/{channelId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint(
+    "channel data",
+    "channelId",
+    errors=(
+        (
+            ("not found", "unavailable"),
+            404,
+            "Channel with ID {channelId} not found or unavailable",
+        ),
+    ),
+)
 async def get_channel(channelId: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_channel(channelId)
-
-        if not results:
-            raise HTTPException(status_code=404, detail="Channel not found")
-
-        return {"message": "OK", "query": channelId, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_channel for {channelId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, channel data temporarily unavailable",
-                "channelId": channelId,
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in get_channel for {channelId}: {str(e)}")
-        if "not found" in str(e).lower() or "unavailable" in str(e).lower():
-            raise HTTPException(
-                status_code=404, detail=f"Channel with ID {channelId} not found or unavailable"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching channel data",
-                "channelId": channelId,
-            },
-        )
+    validate_id(channelId, CHANNEL_ID_RE, "channelId", "channel ID")
+    results = await run_ytmusic(YTMusic.get_channel, channelId)
+
+    if not results:
+        raise HTTPException(status_code=404, detail="Channel not found")
+
+    return {"message": "OK", "query": channelId, "result": results}
 
 
 @router.get("/channel_episodes/{channelId}")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint(
+    "channel episodes",
+    "channelId",
+    errors=(
+        (
+            ("not found", "unavailable"),
+            404,
+            "Channel episodes for {channelId} not found or unavailable",
+        ),
+    ),
+)
 async def get_channel_episodes(channelId: str, params: str):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.get_channel_episodes(channelId, params)
-
-        if not results:
-            raise HTTPException(status_code=404, detail="Channel episodes not found")
-
-        return {"message": "OK", "query": channelId, "params": params, "result": results}
-
-    except KeyError as e:
-        logger.error(f"KeyError in get_channel_episodes for {channelId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, channel episodes temporarily unavailable",
-                "channelId": channelId,
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in get_channel_episodes for {channelId}: {str(e)}")
-        if "not found" in str(e).lower() or "unavailable" in str(e).lower():
-            raise HTTPException(
-                status_code=404, detail=f"Channel episodes for {channelId} not found or unavailable"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while fetching channel episodes",
-                "channelId": channelId,
-            },
-        )
+    validate_id(channelId, CHANNEL_ID_RE, "channelId", "channel ID")
+    results = await run_ytmusic(YTMusic.get_channel_episodes, channelId, params)
+
+    if not results:
+        raise HTTPException(status_code=404, detail="Channel episodes not found")
+
+    return {"message": "OK", "query": channelId, "params": params, "result": results}
 
 
 @router.get("/podcast/{playlistId}")
-@handle_podcast_errors("get_podcast", "playlistId")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint("podcast", "playlistId", errors=_podcast_errors("podcast", "playlistId"))
 async def get_podcast(playlistId: str, limit: int | None = 100):
-    ytmusic = YTMusic()
-    results = ytmusic.get_podcast(playlistId, limit)
+    validate_id(playlistId, PLAYLIST_ID_RE, "playlistId", "podcast ID")
+    results = await run_ytmusic(YTMusic.get_podcast, playlistId, limit)
 
     if not results:
         raise HTTPException(status_code=404, detail="Podcast not found")
@@ -147,10 +89,11 @@ async def get_podcast(playlistId: str, limit: int | None = 100):
 
 
 @router.get("/episode/{videoId}")
-@handle_podcast_errors("get_episode", "videoId")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint("episode", "videoId", errors=_podcast_errors("episode", "videoId"))
 async def get_episode(videoId: str):
-    ytmusic = YTMusic()
-    results = ytmusic.get_episode(videoId)
+    validate_id(videoId, VIDEO_ID_RE, "videoId", "episode video ID")
+    results = await run_ytmusic(YTMusic.get_episode, videoId)
 
     if not results:
         raise HTTPException(status_code=404, detail="Episode not found")
@@ -159,10 +102,15 @@ async def get_episode(videoId: str):
 
 
 @router.get("/episodes_playlist/{playlist_id}")
-@handle_podcast_errors("get_episodes_playlist", "playlist_id")
+@cached(ttl=TTL_MEDIUM)
+@ytmusic_endpoint(
+    "episodes playlist",
+    "playlist_id",
+    errors=_podcast_errors("episodes playlist", "playlist_id"),
+)
 async def get_episodes_playlist(playlist_id: str = "RDPN"):
-    ytmusic = YTMusic()
-    results = ytmusic.get_episodes_playlist(playlist_id)
+    validate_id(playlist_id, PLAYLIST_ID_RE, "playlist_id", "playlist ID")
+    results = await run_ytmusic(YTMusic.get_episodes_playlist, playlist_id)
 
     if not results:
         raise HTTPException(status_code=404, detail="Episodes playlist not found")
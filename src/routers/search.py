@@ -1,9 +1,27 @@
+import functools
 import logging
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
 from ytmusicapi import YTMusic
 
+from src.utils.cache import (
+    TTL_MEDIUM,
+    TTL_SHORT,
+    cached,
+    cached_call,
+    coalesce,
+    invalidate,
+)
+from src.utils.error_handlers import ytmusic_endpoint
+from src.utils.streaming import ndjson_response
+from src.utils.ytmusic_client import (
+    breaker_states,
+    pool_stats,
+    run_ytmusic,
+    run_ytmusic_write,
+)
+
 router = APIRouter()
 
 # Configure logging
@@ -14,15 +32,16 @@ logger = logging.getLogger(__name__)
 async def health_check():
     """Health check endpoint to test basic YTMusic API functionality"""
     try:
-        ytmusic = YTMusic()
         # Try a simple search to test API connectivity
-        test_results = ytmusic.search("test", limit=1)
+        test_results = await run_ytmusic(YTMusic.search, "test", limit=1)
 
         return {
             "status": "healthy",
             "message": "YTMusic API is working correctly",
             "ytmusicapi_working": True,
             "test_search_successful": bool(test_results),
+            "connection_pool": pool_stats(),
+            "circuit_breakers": breaker_states(),
         }
 
     except KeyError as e:
@@ -33,6 +52,8 @@ async def health_check():
             "error_type": "KeyError",
             "error_details": str(e),
             "recommendation": "Use simplified search parameters",
+            "connection_pool": pool_stats(),
+            "circuit_breakers": breaker_states(),
         }
 
     except Exception as e:
@@ -43,6 +64,8 @@ async def health_check():
             "error_type": type(e).__name__,
             "error_details": str(e),
             "recommendation": "Check internet connection and try again later",
+            "connection_pool": pool_stats(),
+            "circuit_breakers": breaker_states(),
         }
 
 
@@ -77,6 +100,8 @@ def _enrich_search_results(results: list[dict[str, Any]]) -> list[dict[str, Any]
 
 
 @router.get("/")
+@cached(ttl=TTL_SHORT)
+@ytmusic_endpoint("your search request", "query", action="processing")
 async def search(
     query: str = Query(..., description="Search query"),
     filter: str | None = None,
@@ -86,9 +111,20 @@ async def search(
     enrich_categories: bool = True,
 ):
     try:
-        ytmusic = YTMusic()
-        search_results = ytmusic.search(
-            query=query, filter=filter, ignore_spelling=ignore_spelling, limit=limit, scope=scope
+        # Keyed on the upstream arguments only, so concurrent requests that differ just in
+        # enrich_categories (cached as separate responses) still share one search
+        search_results = await coalesce(
+            "search",
+            f"{query}|{filter}|{ignore_spelling}|{limit}|{scope}",
+            functools.partial(
+                run_ytmusic,
+                YTMusic.search,
+                query=query,
+                filter=filter,
+                ignore_spelling=ignore_spelling,
+                limit=limit,
+                scope=scope,
+            ),
         )
 
         if not search_results:
@@ -102,13 +138,13 @@ async def search(
 
     except KeyError as e:
         # Handle YouTube Music API structure changes
-        logger.error(f"KeyError in search API: {str(e)}")
+        logger.error("KeyError in search API: %s", e)
 
         # Try search without problematic parameters that might cause parsing issues
         try:
-            ytmusic = YTMusic()
             # Simplified search without scope parameter which might cause issues
-            simplified_results = ytmusic.search(
+            simplified_results = await run_ytmusic(
+                YTMusic.search,
                 query=query,
                 filter=filter,
                 limit=min(limit, 10),  # Reduce limit to avoid complex results
@@ -122,7 +158,7 @@ async def search(
                     "warning": "Some advanced search features may be temporarily unavailable",
                 }
         except Exception as fallback_error:
-            logger.error(f"Fallback search also failed: {str(fallback_error)}")
+            logger.error("Fallback search also failed: %s", fallback_error)
 
         # Return error with helpful message
         raise HTTPException(
@@ -135,38 +171,81 @@ async def search(
             },
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in search: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while processing your search request",
-                "query": query,
-            },
-        )
+
+@router.get("/stream")
+@ytmusic_endpoint("your search request", "query", action="processing")
+async def stream_search(
+    query: str = Query(..., description="Search query"),
+    filter: str | None = None,
+    ignore_spelling: bool = False,
+    limit: int = 20,
+    scope: str | None = None,
+    enrich_categories: bool = True,
+):
+    """Search results as NDJSON, one result per line"""
+    search_results = await cached_call(
+        "search",
+        f"stream:{query}|{filter}|{ignore_spelling}|{limit}|{scope}",
+        TTL_SHORT,
+        functools.partial(
+            run_ytmusic,
+            YTMusic.search,
+            query=query,
+            filter=filter,
+            ignore_spelling=ignore_spelling,
+            limit=limit,
+            scope=scope,
+        ),
+    )
+
+    if not search_results:
+        raise HTTPException(status_code=404, detail="No search result found")
+
+    if enrich_categories:
+        search_results = _enrich_search_results(search_results)
+
+    return ndjson_response(search_results)
+
+
+def _suggestions_key(query: str) -> str:
+    # Suggestions don't depend on case or spacing, so "Aria " and "aria" share an entry
+    return " ".join(query.lower().split())
 
 
 @router.get("/suggestions")
+@cached(ttl=TTL_MEDIUM, namespace="suggestions")
+@ytmusic_endpoint("search suggestions", "query", action="getting")
 async def get_suggestions(
     query: str = Query(..., description="Search query"), detailed_runs: bool = False
 ):
     try:
-        ytmusic = YTMusic()
-        search_results = ytmusic.get_search_suggestions(query=query, detailed_runs=detailed_runs)
+        # Only the detailed form is fetched and cached; the plain form is just its texts,
+        # so both variants of a query cost one upstream call between them
+        search_results = await cached_call(
+            "suggestions",
+            _suggestions_key(query),
+            TTL_MEDIUM,
+            functools.partial(
+                run_ytmusic, YTMusic.get_search_suggestions, query=query, detailed_runs=True
+            ),
+        )
 
         if not search_results:
             raise HTTPException(status_code=404, detail="No search result found")
 
+        if not detailed_runs:
+            search_results = [suggestion["text"] for suggestion in search_results]
+
         return {"message": "OK", "query": query, "result": search_results}
 
     except KeyError as e:
-        logger.error(f"KeyError in search suggestions API: {str(e)}")
+        logger.error("KeyError in search suggestions API: %s", e)
 
         # Try without detailed_runs if that's causing issues
         try:
-            ytmusic = YTMusic()
-            simplified_results = ytmusic.get_search_suggestions(query=query, detailed_runs=False)
+            simplified_results = await run_ytmusic(
+                YTMusic.get_search_suggestions, query=query, detailed_runs=False
+            )
 
             if simplified_results:
                 return {
@@ -187,46 +266,16 @@ async def get_suggestions(
             },
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in search suggestions: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while getting search suggestions",
-                "query": query,
-            },
-        )
-
 
 @router.delete("/suggestions")
+@ytmusic_endpoint("search suggestions", "suggestions", action="removing")
 async def remove_suggestions(
     suggestions: list[dict[str, Any]], indices: list[int] | None = None
 ):
-    try:
-        ytmusic = YTMusic()
-        results = ytmusic.remove_search_suggestions(suggestions=suggestions, indices=indices)
-
-        return {"message": "OK", "query": suggestions, "result": results}
+    results = await run_ytmusic_write(
+        YTMusic.remove_search_suggestions, suggestions=suggestions, indices=indices
+    )
+    # Removed history entries would otherwise keep showing up until the cache expires
+    await invalidate("suggestions")
 
-    except KeyError as e:
-        logger.error(f"KeyError in remove search suggestions API: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "Remove suggestions API error",
-                "message": "Cannot remove search suggestions due to API changes",
-                "suggestions": suggestions,
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in remove search suggestions: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while removing search suggestions",
-                "suggestions": suggestions,
-            },
-        )
+    return {"message": "OK", "query": suggestions, "result": results}
@@ -1,96 +1,125 @@
+import asyncio
+import functools
 import logging
-from typing import Literal
+from typing import Callable, Literal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from ytmusicapi import YTMusic
 
+from src.utils.cache import cached, cached_call, invalidate
+from src.utils.error_handlers import ytmusic_endpoint
+from src.utils.streaming import ndjson_response
+from src.utils.ytmusic_client import run_ytmusic, run_ytmusic_write
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Formats YouTube Music accepts for uploads
+AUDIO_EXTENSIONS = (".mp3", ".flac", ".m4a", ".wav", ".ogg", ".aac")
 
-def handle_upload_errors(operation_name: str):
-    """Helper function to handle common upload-related errors"""
-
-    def decorator(func):
-        async def wrapper(*args, **kwargs):
-            try:
-                return await func(*args, **kwargs)
-
-            except KeyError as e:
-                logger.error(f"KeyError in {operation_name}: {str(e)}")
-                raise HTTPException(
-                    status_code=503,
-                    detail={
-                        "error": "API structure error",
-                        "message": f"YouTube Music API structure has changed, {operation_name.replace('_', ' ')} temporarily unavailable",
-                        "technical_details": str(e),
-                    },
-                )
-
-            except Exception as e:
-                logger.error(f"Unexpected error in {operation_name}: {str(e)}")
-                if "auth" in str(e).lower() or "login" in str(e).lower():
-                    raise HTTPException(
-                        status_code=401,
-                        detail=f"Authentication required to access {operation_name.replace('_', ' ')}",
-                    )
-                elif "not found" in str(e).lower():
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"{operation_name.replace('_', ' ').title()} not found",
-                    )
-
-                raise HTTPException(
-                    status_code=500,
-                    detail={
-                        "error": "Internal server error",
-                        "message": f"An unexpected error occurred while {operation_name.replace('_', ' ')}",
-                    },
-                )
-
-        return wrapper
-
-    return decorator
-
-
-@router.get("/library_upload_songs")
-@handle_upload_errors("get_library_upload_songs")
-async def get_library_upload_songs(
-    limit: int | None = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
-):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_upload_songs(limit, order=order)
+# Uploads change whenever the user adds or deletes one, so listings are only cached
+# briefly and both writes below drop the whole namespace
+UPLOADS_TTL = 60
 
-    return {"message": "OK", "result": results}
+# Validated by FastAPI while parsing the query, before the handler runs
+UploadOrder = Literal["a_to_z", "z_to_a", "recently_added"]
+UploadListing = Literal["songs", "artists", "albums"]
 
+UPLOAD_LISTINGS = {
+    "songs": YTMusic.get_library_upload_songs,
+    "artists": YTMusic.get_library_upload_artists,
+    "albums": YTMusic.get_library_upload_albums,
+}
+
+
+def _upload_errors(kind: str):
+    """Error rules shared by the library upload listing routes"""
+    return (
+        (("auth", "login"), 401, f"Authentication required to access {kind}"),
+        (("not found",), 404, f"{kind.capitalize()} not found"),
+    )
+
+
+def _upload_listing_routes(listing: str) -> tuple[Callable, Callable]:
+    """
+    Register GET /library_upload_{listing} and its NDJSON /stream variant
+
+    The three listings differ only in the ytmusicapi method, so their routes are built here
+    """
+    method = UPLOAD_LISTINGS[listing]
+    resource = f"library upload {listing}"
+    errors = _upload_errors(resource)
+
+    async def handler(limit: int | None = Query(25, ge=1), order: UploadOrder | None = None):
+        results = await run_ytmusic(method, limit, order=order)
+
+        return {"message": "OK", "result": results}
+
+    async def stream_handler(
+        limit: int | None = Query(25, ge=1), order: UploadOrder | None = None
+    ):
+        results = await cached_call(
+            "uploads",
+            f"stream:{listing}:{limit}:{order}",
+            UPLOADS_TTL,
+            functools.partial(run_ytmusic, method, limit, order=order),
+        )
+
+        return ndjson_response(results or [])
+
+    # Named before decorating, since @wraps and the OpenAPI operation id copy the name
+    handler.__name__ = handler.__qualname__ = f"get_library_upload_{listing}"
+    stream_handler.__name__ = stream_handler.__qualname__ = f"stream_library_upload_{listing}"
+    stream_handler.__doc__ = f"Library upload {listing} as NDJSON, one item per line"
+
+    endpoint = cached(ttl=UPLOADS_TTL, namespace="uploads", public=False)(
+        ytmusic_endpoint(resource, errors=errors)(handler)
+    )
+    stream_endpoint = ytmusic_endpoint(resource, errors=errors)(stream_handler)
+    return (
+        router.get(f"/library_upload_{listing}")(endpoint),
+        router.get(f"/library_upload_{listing}/stream")(stream_endpoint),
+    )
 
-@router.get("/library_upload_artists")
-@handle_upload_errors("get_library_upload_artists")
-async def get_library_upload_artists(
-    limit: int | None = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
-):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_upload_artists(limit, order=order)
 
-    return {"message": "OK", "result": results}
+get_library_upload_songs, stream_library_upload_songs = _upload_listing_routes("songs")
+get_library_upload_artists, stream_library_upload_artists = _upload_listing_routes("artists")
+get_library_upload_albums, stream_library_upload_albums = _upload_listing_routes("albums")
 
 
-@router.get("/library_upload_albums")
-@handle_upload_errors("get_library_upload_albums")
-async def get_library_upload_albums(
-    limit: int | None = 25, order: Literal["a_to_z", "z_to_a", "recently_added"] | None = None
+@router.get("/library_uploads/batch")
+@cached(ttl=UPLOADS_TTL, namespace="uploads", public=False)
+async def get_library_uploads_batch(
+    limit: int | None = Query(25, ge=1),
+    order: UploadOrder | None = None,
+    include: list[UploadListing] = Query(["songs", "artists", "albums"]),
 ):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_upload_albums(limit, order=order)
+    """Upload songs, artists and albums in one request; a failed listing doesn't fail the batch"""
+    listings = list(dict.fromkeys(include))
+    outcomes = await asyncio.gather(
+        *(run_ytmusic(UPLOAD_LISTINGS[name], limit, order=order) for name in listings),
+        return_exceptions=True,
+    )
 
-    return {"message": "OK", "result": results}
+    results = {}
+    errors = {}
+    for name, outcome in zip(listings, outcomes):
+        if isinstance(outcome, Exception):
+            logger.info("Batch upload listing %s failed: %s", name, outcome)
+            errors[name] = {"error": type(outcome).__name__, "message": str(outcome)}
+        else:
+            results[name] = outcome
+
+    return {"message": "OK", "query": listings, "results": results, "errors": errors}
 
 
 @router.get("/library_upload_artist/{browseId}")
-@handle_upload_errors("get_library_upload_artist")
-async def get_library_upload_artist(browseId: str, limit: int = 25):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_upload_artist(browseId, limit)
+@cached(ttl=UPLOADS_TTL, namespace="uploads", public=False)
+@ytmusic_endpoint(
+    "library upload artist", "browseId", errors=_upload_errors("library upload artist")
+)
+async def get_library_upload_artist(browseId: str, limit: int = Query(25, ge=1)):
+    results = await run_ytmusic(YTMusic.get_library_upload_artist, browseId, limit)
 
     if not results:
         raise HTTPException(status_code=404, detail=f"Upload artist with ID {browseId} not found")
@@ -99,10 +128,12 @@ async def get_library_upload_artist(browseId: str, limit: int = 25):
 
 
 @router.get("/library_upload_album/{browseId}")
-@handle_upload_errors("get_library_upload_album")
+@cached(ttl=UPLOADS_TTL, namespace="uploads", public=False)
+@ytmusic_endpoint(
+    "library upload album", "browseId", errors=_upload_errors("library upload album")
+)
 async def get_library_upload_album(browseId: str):
-    ytmusic = YTMusic()
-    results = ytmusic.get_library_upload_album(browseId)
+    results = await run_ytmusic(YTMusic.get_library_upload_album, browseId)
 
     if not results:
         raise HTTPException(status_code=404, detail=f"Upload album with ID {browseId} not found")
@@ -111,111 +142,59 @@ async def get_library_upload_album(browseId: str):
 
 
 @router.post("/upload_song/{filepath}")
+@ytmusic_endpoint(
+    "song",
+    "filepath",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to upload songs"),
+        (("file not found", "no such file"), 404, "File not found: {filepath}"),
+        (("quota", "limit"), 429, "Upload quota exceeded or rate limit reached"),
+        (
+            ("format", "unsupported"),
+            400,
+            "Unsupported file format or corrupted file: {filepath}",
+        ),
+    ),
+    action="uploading",
+)
 async def upload_song(filepath: str):
-    try:
-        # Basic validation
-        if not filepath.strip():
-            raise HTTPException(status_code=400, detail="Filepath cannot be empty")
-
-        # Check if filepath has a valid audio extension
-        valid_extensions = [".mp3", ".flac", ".m4a", ".wav", ".ogg", ".aac"]
-        if not any(filepath.lower().endswith(ext) for ext in valid_extensions):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file extension. Supported formats: {', '.join(valid_extensions)}",
-            )
-
-        ytmusic = YTMusic()
-        results = ytmusic.upload_song(filepath)
-
-        return {"message": "OK", "filepath": filepath, "result": results}
+    # Basic validation
+    if not filepath.strip():
+        raise HTTPException(status_code=400, detail="Filepath cannot be empty")
 
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in upload_song for {filepath}: {str(e)}")
+    # Check if filepath has a valid audio extension
+    if not filepath.lower().endswith(AUDIO_EXTENSIONS):
         raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot upload song",
-                "filepath": filepath,
-                "technical_details": str(e),
-            },
+            status_code=400,
+            detail=f"Invalid file extension. Supported formats: {', '.join(AUDIO_EXTENSIONS)}",
         )
 
-    except Exception as e:
-        logger.error(f"Unexpected error in upload_song for {filepath}: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(status_code=401, detail="Authentication required to upload songs")
-        elif "file not found" in str(e).lower() or "no such file" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"File not found: {filepath}")
-        elif "quota" in str(e).lower() or "limit" in str(e).lower():
-            raise HTTPException(
-                status_code=429, detail="Upload quota exceeded or rate limit reached"
-            )
-        elif "format" in str(e).lower() or "unsupported" in str(e).lower():
-            raise HTTPException(
-                status_code=400, detail=f"Unsupported file format or corrupted file: {filepath}"
-            )
+    results = await run_ytmusic_write(YTMusic.upload_song, filepath)
+    await invalidate("uploads")
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while uploading song",
-                "filepath": filepath,
-            },
-        )
+    return {"message": "OK", "filepath": filepath, "result": results}
 
 
 @router.delete("/upload_entity/{entityId}")
+@ytmusic_endpoint(
+    "upload entity",
+    "entityId",
+    errors=(
+        (("auth", "login"), 401, "Authentication required to delete upload entities"),
+        (("not found",), 404, "Upload entity with ID {entityId} not found"),
+        (
+            ("permission",),
+            403,
+            "You don't have permission to delete this upload entity",
+        ),
+    ),
+    action="deleting",
+)
 async def delete_upload_entity(entityId: str):
-    try:
-        if not entityId.strip():
-            raise HTTPException(status_code=400, detail="Entity ID cannot be empty")
-
-        ytmusic = YTMusic()
-        results = ytmusic.delete_upload_entity(entityId)
+    if not entityId.strip():
+        raise HTTPException(status_code=400, detail="Entity ID cannot be empty")
 
-        return {"message": "OK", "entityId": entityId, "result": results}
+    results = await run_ytmusic_write(YTMusic.delete_upload_entity, entityId)
+    await invalidate("uploads")
 
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions
-
-    except KeyError as e:
-        logger.error(f"KeyError in delete_upload_entity for {entityId}: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "API structure error",
-                "message": "YouTube Music API structure has changed, cannot delete upload entity",
-                "entityId": entityId,
-                "technical_details": str(e),
-            },
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error in delete_upload_entity for {entityId}: {str(e)}")
-        if "auth" in str(e).lower() or "login" in str(e).lower():
-            raise HTTPException(
-                status_code=401, detail="Authentication required to delete upload entities"
-            )
-        elif "not found" in str(e).lower():
-            raise HTTPException(
-                status_code=404, detail=f"Upload entity with ID {entityId} not found"
-            )
-        elif "permission" in str(e).lower():
-            raise HTTPException(
-                status_code=403, detail="You don't have permission to delete this upload entity"
-            )
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred while deleting upload entity",
-                "entityId": entityId,
-            },
-        )
+    return {"message": "OK", "entityId": entityId, "result": results}
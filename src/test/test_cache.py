@@ -0,0 +1,238 @@
+import asyncio
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from src.utils import cache
+from src.utils.cache import cached, cached_call, invalidate
+
+app = FastAPI()
+calls = []
+upstream = {"status": None}
+
+
+@app.get("/items/{item_id}")
+@cached(ttl=60)
+async def get_item(item_id: str, limit: int = 3):
+    calls.append((item_id, limit))
+    return {"message": "OK", "query": item_id, "limit": limit}
+
+
+@app.get("/flaky/{item_id}")
+@cached(ttl=0)
+async def get_flaky(item_id: str):
+    if upstream["status"] is not None:
+        raise HTTPException(status_code=upstream["status"], detail="upstream failed")
+    return {"message": "OK", "query": item_id}
+
+
+def setup_function():
+    cache.backend = cache.MemoryCache()
+    cache.REFRESH_DELAY = 0
+    calls.clear()
+    upstream["status"] = None
+
+
+def test_second_request_is_served_from_cache():
+    client = TestClient(app)
+
+    first = client.get("/items/a")
+    second = client.get("/items/a")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json() == {"message": "OK", "query": "a", "limit": 3}
+    assert calls == [("a", 3)]
+
+
+def test_query_string_is_part_of_the_key():
+    client = TestClient(app)
+
+    client.get("/items/a?limit=1")
+    client.get("/items/a?limit=2")
+
+    assert calls == [("a", 1), ("a", 2)]
+
+
+def test_invalidate_drops_namespace():
+    client = TestClient(app)
+
+    client.get("/items/a")
+    asyncio.run(invalidate("get_item"))
+    response = client.get("/items/a")
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(calls) == 2
+
+
+def test_expired_entry_is_served_stale_when_upstream_fails():
+    client = TestClient(app)
+
+    assert client.get("/flaky/a").headers["X-Cache"] == "MISS"
+    upstream["status"] = 503
+    response = client.get("/flaky/a")
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "STALE"
+    assert response.headers["Warning"].startswith("110")
+    assert response.json() == {"message": "OK", "query": "a"}
+
+
+def test_client_errors_are_not_masked_by_stale_entries():
+    client = TestClient(app)
+
+    client.get("/flaky/a")
+    upstream["status"] = 404
+
+    assert client.get("/flaky/a").status_code == 404
+
+
+@app.get("/countries/{country}")
+@cached(ttl=60, key_builder=lambda country: country.upper())
+async def get_country(country: str):
+    calls.append(country)
+    return {"message": "OK", "query": country.upper()}
+
+
+def test_key_builder_shares_entries_between_spellings():
+    client = TestClient(app)
+
+    client.get("/countries/us")
+    response = client.get("/countries/US")
+
+    assert response.headers["X-Cache"] == "HIT"
+    assert calls == ["us"]
+
+
+def test_tiered_cache_fills_l1_from_l2():
+    l1, l2 = cache.MemoryCache(), cache.MemoryCache()
+    tiered = cache.TieredCache(l1, l2)
+
+    async def run():
+        await l2.set("key", b"value", 60)
+        value = await tiered.get("key")
+        return value, await l1.get("key")
+
+    assert asyncio.run(run()) == (b"value", b"value")
+
+
+def test_cached_call_skips_fetch_on_hit_and_ignores_empty_results():
+    fetched = []
+
+    async def fetch(value):
+        fetched.append(value)
+        return value
+
+    async def run():
+        first = await cached_call("items", "a", 60, lambda: fetch({"id": "a"}))
+        second = await cached_call("items", "a", 60, lambda: fetch({"id": "other"}))
+        await cached_call("items", "empty", 60, lambda: fetch({}))
+        await cached_call("items", "empty", 60, lambda: fetch({}))
+        return first, second
+
+    assert asyncio.run(run()) == ({"id": "a"}, {"id": "a"})
+    assert fetched == [{"id": "a"}, {}, {}]
+
+
+@app.get("/slow/{item_id}")
+@cached(ttl=60)
+async def get_slow(item_id: str):
+    calls.append(item_id)
+    await asyncio.sleep(0.05)
+    return {"message": "OK", "query": item_id}
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    async def run():
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/slow/a") for _ in range(5)))
+
+    responses = asyncio.run(run())
+
+    assert calls == ["a"]
+    assert all(response.json() == {"message": "OK", "query": "a"} for response in responses)
+    assert not cache._inflight
+
+
+@app.get("/large/{item_id}")
+@cached(ttl=60)
+async def get_large(item_id: str):
+    return {"message": "OK", "query": item_id, "result": ["track"] * 500}
+
+
+def test_large_payloads_are_stored_compressed_and_served_per_client():
+    client = TestClient(app)
+
+    client.get("/large/a")
+    gzip_response = client.get("/large/a", headers={"Accept-Encoding": "gzip"})
+    plain_response = client.get("/large/a", headers={"Accept-Encoding": "identity"})
+
+    assert gzip_response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain_response.headers
+    assert gzip_response.json() == plain_response.json()
+    assert plain_response.json()["result"] == ["track"] * 500
+
+
+def test_request_parameter_is_hidden_from_openapi():
+    parameters = app.openapi()["paths"]["/items/{item_id}"]["get"]["parameters"]
+
+    assert [parameter["name"] for parameter in parameters] == ["item_id", "limit"]
+
+
+def test_memory_cache_evicts_least_recently_used():
+    store = cache.MemoryCache(max_entries=2)
+
+    async def run():
+        await store.set("a", b"1", 60)
+        await store.set("b", b"2", 60)
+        await store.get("a")
+        await store.set("c", b"3", 60)
+        return [await store.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [b"1", None, b"3"]
+
+
+def test_responses_carry_etag_and_answer_conditional_requests_with_304():
+    client = TestClient(app)
+
+    first = client.get("/items/a")
+    etag = first.headers["ETag"]
+    revalidated = client.get("/items/a", headers={"If-None-Match": etag})
+    changed = client.get("/items/a", headers={"If-None-Match": 'W/"other"'})
+
+    assert first.headers["Cache-Control"] == "public, max-age=60, stale-while-revalidate=240"
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert changed.status_code == 200
+    assert calls == [("a", 3)]
+
+
+@app.get("/account/{item_id}")
+@cached(ttl=60, public=False)
+async def get_account_item(item_id: str):
+    return {"message": "OK", "query": item_id}
+
+
+def test_private_routes_are_not_cacheable_by_shared_caches():
+    response = TestClient(app).get("/account/a")
+
+    assert response.headers["Cache-Control"] == "private, max-age=60, stale-while-revalidate=240"
+
+
+def test_coalesce_shares_one_fetch_between_concurrent_callers():
+    fetched = []
+
+    async def fetch():
+        fetched.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def run():
+        return await asyncio.gather(*(cache.coalesce("search", "a", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == [["result"]] * 5
+    assert fetched == [1]
+    assert not cache._inflight
\ No newline at end of file
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from ytmusicapi.exceptions import YTMusicServerError, YTMusicUserError
+
+from src.utils import ytmusic_client
+from src.utils.circuit_breaker import CircuitBreaker, is_upstream_failure
+
+
+def test_only_upstream_failures_count():
+    assert is_upstream_failure(KeyError("header"))
+    assert is_upstream_failure(YTMusicServerError("Server returned HTTP 503: Service Unavailable."))
+    assert not is_upstream_failure(YTMusicServerError("Server returned HTTP 404: Not Found."))
+    assert not is_upstream_failure(YTMusicUserError("Invalid videoId"))
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.utils.circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("search", fail_max=2, reset_timeout=30)
+
+    breaker.record(KeyError("contents"))
+    breaker.record(None)
+    breaker.record(KeyError("contents"))
+    assert breaker.state == "closed"
+
+    breaker.record(KeyError("contents"))
+    assert breaker.state == "open"
+    with pytest.raises(HTTPException) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "30"}
+
+    # After the window one trial goes through; a failing trial reopens straight away
+    now[0] += 30
+    breaker.before_call()
+    with pytest.raises(HTTPException):
+        breaker.before_call()
+    breaker.record(KeyError("contents"))
+    assert breaker.state == "open"
+
+    now[0] += 30
+    breaker.before_call()
+    breaker.record(None)
+    assert breaker.state == "closed"
+
+
+def _broken_lookup(ytmusic):
+    _broken_lookup.calls += 1
+    raise KeyError("musicShelfRenderer")
+
+
+def test_run_ytmusic_fails_fast_while_the_circuit_is_open(monkeypatch):
+    _broken_lookup.calls = 0
+    monkeypatch.setattr(ytmusic_client, "BREAKER_FAIL_MAX", 2)
+    monkeypatch.setattr(ytmusic_client, "_breakers", {})
+
+    async def run():
+        statuses = []
+        for _ in range(4):
+            try:
+                await ytmusic_client.run_ytmusic(_broken_lookup)
+            except HTTPException as e:
+                statuses.append(e.status_code)
+            except KeyError:
+                statuses.append("KeyError")
+        return statuses
+
+    try:
+        statuses = asyncio.run(run())
+    finally:
+        ytmusic_client.shutdown()
+
+    assert statuses == ["KeyError", "KeyError", 503, 503]
+    assert _broken_lookup.calls == 2
+    assert ytmusic_client.breaker_states() == {"_broken_lookup": "open"}
+
+def test_cancelled_waiter_hands_back_the_half_open_trial(monkeypatch):
+    _broken_lookup.calls = 0
+    monkeypatch.setattr(ytmusic_client, "BREAKER_FAIL_MAX", 1)
+    monkeypatch.setattr(ytmusic_client, "_breakers", {})
+
+    async def run():
+        with pytest.raises(KeyError):
+            await ytmusic_client.run_ytmusic(_broken_lookup)
+        breaker = ytmusic_client._breakers["_broken_lookup"]
+        breaker._opened_at -= breaker.reset_timeout
+
+        # The trial call is cancelled while it still waits for a pool slot
+        monkeypatch.setattr(ytmusic_client, "_read_slots", asyncio.Semaphore(0))
+        waiter = asyncio.create_task(ytmusic_client.run_ytmusic(_broken_lookup))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # The next call gets the trial instead of a 503
+        monkeypatch.setattr(ytmusic_client, "_read_slots", asyncio.Semaphore(1))
+        with pytest.raises(KeyError):
+            await ytmusic_client.run_ytmusic(_broken_lookup)
+
+    try:
+        asyncio.run(run())
+    finally:
+        ytmusic_client.shutdown()
+
+    assert _broken_lookup.calls == 2
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.routers.browsing import SONG_RELATED_ERROR_RE
+from src.utils.error_handlers import YTMusicErrorHandler, match_error, ytmusic_endpoint
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("Server returned HTTP 400: Bad Request", "bad_request"),
+        ("Server returned HTTP 503: Service Unavailable", "not_found"),
+        ("Server returned HTTP 500", "upstream"),
+        ("Video is private", "access"),
+        ("Something else", None),
+    ],
+)
+def test_match_error_prefers_first_declared_group(message, expected):
+    assert match_error(SONG_RELATED_ERROR_RE, Exception(message)) == expected
+
+
+@ytmusic_endpoint(
+    "album data",
+    "browseId",
+    errors=(
+        (("not found",), 404, "Album with ID {browseId} not found"),
+        (("invalid",), 400, "Invalid input data: {error}"),
+    ),
+)
+async def get_album(browseId: str, message: str):
+    raise Exception(message)
+
+
+@pytest.mark.parametrize(
+    "message, status_code, detail",
+    [
+        ("Invalid album: Not Found", 404, "Album with ID A1 not found"),
+        ("Invalid album", 400, "Invalid input data: Invalid album"),
+    ],
+)
+def test_ytmusic_endpoint_applies_rules_in_order(message, status_code, detail):
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_album(browseId="A1", message=message))
+
+    assert excinfo.value.status_code == status_code
+    assert excinfo.value.detail == detail
+
+
+def test_ytmusic_endpoint_reports_unmatched_errors_as_500():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_album(browseId="A1", message="boom"))
+
+    assert excinfo.value.status_code == 500
+    assert excinfo.value.detail["browseId"] == "A1"
+
+
+@YTMusicErrorHandler.handle_common_errors("library_access", "UC1")
+async def get_library(message: str):
+    raise Exception(message)
+
+
+@pytest.mark.parametrize(
+    "message, status_code",
+    [
+        ("Please LOGIN first", 401),
+        ("Playlist does not exist", 404),
+        ("Access denied: rate limit", 403),
+        ("Too many requests", 429),
+        ("Malformed request", 400),
+        ("boom", 500),
+    ],
+)
+def test_handle_common_errors_classifies_messages(message, status_code):
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_library(message=message))
+
+    assert excinfo.value.status_code == status_code
\ No newline at end of file
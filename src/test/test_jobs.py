@@ -0,0 +1,99 @@
+import asyncio
+
+from src.utils import cache, jobs
+
+
+def setup_function():
+    cache.backend = cache.MemoryCache()
+    jobs._local_jobs.clear()
+
+
+def test_job_result_is_available_after_completion():
+    async def fetch():
+        await asyncio.sleep(0)
+        return ["song"]
+
+    async def run():
+        job_id = await jobs.submit("songs", fetch)
+        pending = await jobs.get_job(job_id)
+        await asyncio.gather(*jobs._tasks)
+        return pending, await jobs.get_job(job_id)
+
+    pending, done = asyncio.run(run())
+
+    assert pending["status"] == "PENDING"
+    assert done["status"] == "SUCCESS"
+    assert done["result"] == ["song"]
+
+
+def test_failed_job_records_the_error():
+    async def fetch():
+        raise ValueError("upstream failed")
+
+    async def run():
+        job_id = await jobs.submit("songs", fetch)
+        await asyncio.gather(*jobs._tasks)
+        return await jobs.get_job(job_id)
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "FAILURE"
+    assert job["error"] == "ValueError"
+    assert job["message"] == "upstream failed"
+
+
+def test_unknown_job_is_none():
+    assert asyncio.run(jobs.get_job("missing")) is None
+
+
+def test_jobs_are_not_evicted_by_cached_responses():
+    cache.backend = cache.MemoryCache(max_entries=1)
+
+    async def fetch():
+        await asyncio.sleep(0)
+        return ["song"]
+
+    async def run():
+        job_id = await jobs.submit("songs", fetch)
+        await cache.backend.set("resp:search:a", b"{}", 60)
+        await cache.backend.set("resp:search:b", b"{}", 60)
+        await asyncio.gather(*jobs._tasks)
+        return job_id
+
+    job_id = asyncio.run(run())
+
+    assert asyncio.run(jobs.get_job(job_id))["status"] == "SUCCESS"
+    assert asyncio.run(cache.backend.get(jobs._job_key(job_id))) is None
+
+
+class FakeRedisCache(cache.RedisCache):
+    def __init__(self):
+        self.values = {}
+        self.kept_stale = []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl, keep_stale=True):
+        self.values[key] = value
+        self.kept_stale.append(keep_stale)
+
+
+def test_redis_jobs_skip_the_in_process_tier_and_the_stale_copy():
+    l1, l2 = cache.MemoryCache(), FakeRedisCache()
+    cache.backend = cache.TieredCache(l1, l2)
+
+    async def fetch():
+        return ["song"]
+
+    async def run():
+        job_id = await jobs.submit("songs", fetch)
+        await asyncio.gather(*jobs._tasks)
+        return job_id
+
+    job_id = asyncio.run(run())
+
+    assert asyncio.run(jobs.get_job(job_id))["status"] == "SUCCESS"
+    assert asyncio.run(l1.get(jobs._job_key(job_id))) is None
+    assert l2.kept_stale and not any(l2.kept_stale)
+    assert not jobs._local_jobs
\ No newline at end of file
@@ -0,0 +1,46 @@
+import pytest
+from fastapi import HTTPException
+
+from src.utils.validation import (
+    ALBUM_BROWSE_ID_RE,
+    CHANNEL_ID_RE,
+    PLAYLIST_ID_RE,
+    SONG_RELATED_ID_RE,
+    VIDEO_ID_RE,
+    validate_id,
+)
+
+
+@pytest.mark.parametrize(
+    "value, pattern",
+    [
+        ("UCmMUZbaYdNH0bEd1PAlAqsA", CHANNEL_ID_RE),
+        ("MPLAUCmMUZbaYdNH0bEd1PAlAqsA", CHANNEL_ID_RE),
+        ("dQw4w9WgXcQ", VIDEO_ID_RE),
+        ("MPREb_4pL8gzRtw1p", ALBUM_BROWSE_ID_RE),
+        ("PLQwVIlKxHM6qv-o99iX9R85og7IzF9YS_", PLAYLIST_ID_RE),
+        ("LM", PLAYLIST_ID_RE),
+        ("dQw4w9WgXcQ", SONG_RELATED_ID_RE),
+        ("MPTRt_J06gtxzw8Sv", SONG_RELATED_ID_RE),
+    ],
+)
+def test_well_formed_ids_pass(value, pattern):
+    validate_id(value, pattern, "id", "ID")
+
+
+@pytest.mark.parametrize(
+    "value, pattern",
+    [
+        ("UCshort", CHANNEL_ID_RE),
+        ("dQw4w9WgXcQ&t=1", VIDEO_ID_RE),
+        ("OLAK5uy_abc", ALBUM_BROWSE_ID_RE),
+        ("PL abc/def", PLAYLIST_ID_RE),
+        ("MPREb_4pL8gzRtw1p", SONG_RELATED_ID_RE),
+    ],
+)
+def test_malformed_ids_are_rejected_with_400(value, pattern):
+    with pytest.raises(HTTPException) as excinfo:
+        validate_id(value, pattern, "id", "ID")
+
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail["id"] == value
\ No newline at end of file
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ReadTimeoutError
+from ytmusicapi import YTMusic
+
+from src.utils import ytmusic_client
+
+
+def _describe(ytmusic, value, offset=0):
+    return ytmusic, threading.current_thread().name, value + offset
+
+
+def test_run_ytmusic_uses_pool_thread_client():
+    async def run():
+        return await asyncio.gather(
+            *(ytmusic_client.run_ytmusic(_describe, i, offset=1) for i in range(4))
+        )
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        ytmusic_client.shutdown()
+
+    for ytmusic, thread_name, value in results:
+        assert isinstance(ytmusic, YTMusic)
+        assert thread_name.startswith("ytmusic")
+    assert [value for _, _, value in results] == [1, 2, 3, 4]
+
+
+def test_get_ytmusic_is_cached_per_thread():
+    assert ytmusic_client.get_ytmusic() is ytmusic_client.get_ytmusic()
+    ytmusic_client.shutdown()
+
+
+def test_http2_session_forwards_requests_through_httpx():
+    seen = {}
+
+    def handler(request):
+        seen["cookie"] = request.headers["cookie"]
+        seen["body"] = request.content
+        return httpx.Response(400, json={"error": {"message": "bad"}})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    session = ytmusic_client.Http2Session(client)
+    response = session.post(
+        "https://music.youtube.com/youtubei/v1/browse",
+        json={"browseId": "x"},
+        headers={"X-Goog-Visitor-Id": "v"},
+        cookies={"SOCS": "CAI"},
+        proxies=None,
+    )
+    client.close()
+
+    assert response.status_code == 400
+    assert response.reason == "Bad Request"
+    assert response.json() == {"error": {"message": "bad"}}
+    assert seen == {"cookie": "SOCS=CAI", "body": b'{"browseId":"x"}'}
+
+
+def test_token_bucket_spaces_calls_beyond_the_burst():
+    bucket = ytmusic_client.TokenBucket(rate=50, burst=2)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Two calls ride the burst, the other three wait 1/50s each
+    assert 0.05 <= asyncio.run(run()) < 0.5
+
+
+def test_pool_stats_counts_the_pooled_sessions():
+    # A fresh thread, since clients are cached per thread and outlive shutdown()
+    thread = threading.Thread(target=ytmusic_client.get_ytmusic)
+    thread.start()
+    thread.join()
+    try:
+        stats = ytmusic_client.pool_stats()
+    finally:
+        ytmusic_client.shutdown()
+
+    assert stats["transport"] == "http1.1"
+    assert stats["clients"] >= 1
+    assert stats["connections_opened"] == stats["requests_sent"] == 0
+
+
+def test_writes_are_not_queued_behind_reads(monkeypatch):
+    release = threading.Event()
+
+    def blocked_read(ytmusic):
+        release.wait(5)
+        return "read"
+
+    async def run():
+        monkeypatch.setattr(ytmusic_client, "_read_slots", asyncio.Semaphore(1))
+        reads = [
+            asyncio.ensure_future(ytmusic_client.run_ytmusic(blocked_read)) for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        # Two reads are parked on the bulkhead, so the write still finds a free thread
+        written = await asyncio.wait_for(
+            ytmusic_client.run_ytmusic_write(lambda ytmusic: "write"), timeout=2
+        )
+        release.set()
+        return written, await asyncio.gather(*reads)
+
+    monkeypatch.setattr(ytmusic_client, "MAX_WORKERS", 2)
+    try:
+        written, read = asyncio.run(run())
+    finally:
+        release.set()
+        ytmusic_client.shutdown()
+
+    assert written == "write"
+    assert read == ["read"] * 3
+
+def test_session_never_resends_a_request_that_may_have_been_processed():
+    session = ytmusic_client._build_session()
+    retry = session.get_adapter("https://music.youtube.com").max_retries
+    session.close()
+
+    timeout = ReadTimeoutError(None, "/youtubei/v1/browse/edit_playlist", "Read timed out.")
+    with pytest.raises(MaxRetryError):
+        retry.increment("POST", "/youtubei/v1/browse/edit_playlist", error=timeout)
+    assert retry.is_retry("POST", 429)
+    assert retry.increment("POST", "/youtubei/v1/search", error=NewConnectionError(None, "refused"))
\ No newline at end of file
@@ -0,0 +1,444 @@
+"""
+Response caching for idempotent GET routes
+
+Cached handlers store their JSON body as bytes keyed by route, path and query string, so
+a hit is served without touching YouTube Music or re-encoding the payload. Entries live
+in an in-process LRU by default; setting REDIS_URL shares them across workers through
+Redis (run it with maxmemory-policy allkeys-lfu so hot keys survive eviction), with a
+short-lived in-process LRU kept in front of it so hot keys skip the Redis round trip.
+
+Payloads above COMPRESS_MIN_SIZE are stored gzip-compressed, which shrinks Redis traffic
+and memory several-fold; clients that accept gzip get the stored bytes as-is with
+Content-Encoding: gzip, so a hit is never decompressed and re-compressed.
+
+Every entry also keeps a stale copy for STALE_TTL. When YouTube Music fails or changes
+its response structure, the last good copy is served with X-Cache: STALE and refreshed
+in the background, so an upstream outage doesn't take the cached routes down with it.
+
+Responses also carry an ETag and Cache-Control (max-age plus stale-while-revalidate), so a
+CDN or browser in front of the API can absorb repeat traffic, and revalidations that
+match the ETag are answered with an empty 304. Account-scoped routes are marked private,
+so only the requesting client's own cache may keep them.
+"""
+
+import asyncio
+import functools
+import gzip
+import hashlib
+import inspect
+import logging
+import os
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi import HTTPException, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Tiered TTLs: catalogue pages barely change, feeds refresh hourly, recommendations churn
+TTL_LONG = 24 * 60 * 60
+TTL_MEDIUM = 60 * 60
+TTL_SHORT = 10 * 60
+
+# How long a response stays available as a fallback once its TTL has passed
+STALE_TTL = 7 * 24 * 60 * 60
+
+# Give the upstream a moment to recover before retrying a failed refresh
+REFRESH_DELAY = 5
+
+# Same threshold and level as the app's GZipMiddleware
+COMPRESS_MIN_SIZE = 512
+COMPRESS_LEVEL = 5
+GZIP_MAGIC = b"\x1f\x8b"
+
+MAX_ENTRIES = 1024
+
+# In front of Redis, the in-process tier holds more keys but only for a few minutes so
+# workers don't drift far from the shared copy
+L1_MAX_ENTRIES = 2048
+L1_TTL = 5 * 60
+
+
+class MemoryCache:
+    """Bounded LRU of byte payloads with a fresh and a stale expiry per entry"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[bytes, float, float]] = OrderedDict()
+
+    def _lookup(self, key: str) -> tuple[bytes, float] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, fresh_until, stale_until = entry
+        if stale_until <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value, fresh_until
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._lookup(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    async def get_stale(self, key: str) -> bytes | None:
+        entry = self._lookup(key)
+        return entry[0] if entry is not None else None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl, now + max(ttl, STALE_TTL))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+
+class RedisCache:
+    """Redis-backed store; a Redis outage degrades to cache misses instead of failing requests"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self._redis.get(key)
+        except Exception as e:
+            logger.warning("Redis GET failed for %s: %s", key, e)
+            return None
+
+    async def get_stale(self, key: str) -> bytes | None:
+        try:
+            return await self._redis.get(key + ":stale")
+        except Exception as e:
+            logger.warning("Redis GET failed for %s:stale: %s", key, e)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: int, keep_stale: bool = True) -> None:
+        try:
+            if not keep_stale:
+                await self._redis.set(key, value, ex=ttl)
+                return
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=ttl)
+                pipe.set(key + ":stale", value, ex=max(ttl, STALE_TTL))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Redis SET failed for %s: %s", key, e)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        try:
+            # Collect first and unlink in one command rather than a round trip per key
+            keys = [key async for key in self._redis.scan_iter(match=prefix + "*", count=500)]
+            if keys:
+                await self._redis.unlink(*keys)
+        except Exception as e:
+            logger.warning("Redis invalidation failed for %s: %s", prefix, e)
+
+
+class TieredCache:
+    """In-process LRU (L1) consulted before a shared Redis cache (L2)"""
+
+    def __init__(self, l1: MemoryCache, l2: RedisCache, l1_ttl: int = L1_TTL):
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.l1.get(key)
+        if value is None:
+            value = await self.l2.get(key)
+            if value is not None:
+                await self.l1.set(key, value, self.l1_ttl)
+        return value
+
+    async def get_stale(self, key: str) -> bytes | None:
+        value = await self.l1.get_stale(key)
+        if value is None:
+            value = await self.l2.get_stale(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.l1.set(key, value, min(ttl, self.l1_ttl))
+        await self.l2.set(key, value, ttl)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await self.l1.delete_prefix(prefix)
+        await self.l2.delete_prefix(prefix)
+
+
+def _create_backend() -> MemoryCache | TieredCache:
+    redis_url = os.environ.get("REDIS_URL")
+    if not redis_url:
+        return MemoryCache()
+    return TieredCache(MemoryCache(L1_MAX_ENTRIES), RedisCache(redis_url))
+
+
+backend: MemoryCache | TieredCache = _create_backend()
+
+# Keys with a background refresh in flight, and strong references to those tasks
+_refreshing: set[str] = set()
+_refresh_tasks: set[asyncio.Task] = set()
+
+# Cache misses currently being loaded, so concurrent callers share one upstream call
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _make_key(namespace: str, material: str) -> str:
+    return f"resp:{namespace}:{hashlib.sha1(material.encode()).hexdigest()}"
+
+
+def _cache_key(namespace: str, request: Request, custom: str | None) -> str:
+    if custom is None:
+        custom = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+    return _make_key(namespace, custom)
+
+
+def _encode(content: bytes) -> bytes:
+    """Compress a JSON payload for storage; mtime=0 keeps the output deterministic"""
+    if len(content) < COMPRESS_MIN_SIZE:
+        return content
+    return gzip.compress(content, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def _decode(stored: bytes) -> bytes:
+    # JSON never starts with the gzip magic bytes, so they mark compressed entries
+    if stored[:2] == GZIP_MAGIC:
+        return gzip.decompress(stored)
+    return stored
+
+
+def _etag(stored: bytes) -> str:
+    # Weak because the same entry is served both gzip-encoded and plain; the stored bytes are
+    # deterministic (gzip mtime=0), so every worker derives the same tag for the same payload
+    return f'W/"{hashlib.blake2b(stored, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides
+    return etag.removeprefix("W/") in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    )
+
+
+def _json_response(
+    stored: bytes, status: str, request: Request, max_age: int, ttl: int, public: bool
+) -> Response:
+    etag = _etag(stored)
+    headers = {
+        "X-Cache": status,
+        "ETag": etag,
+        # A stale copy is only a fallback, so downstream caches must revalidate it
+        "Cache-Control": (
+            f"{'public' if public else 'private'}, "
+            f"max-age={0 if status == 'STALE' else max_age}, "
+            f"stale-while-revalidate={ttl * 4}"
+        ),
+    }
+    if status == "STALE":
+        headers["Warning"] = '110 - "Response is Stale"'
+    if stored[:2] == GZIP_MAGIC:
+        headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and _etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if stored[:2] == GZIP_MAGIC:
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+        else:
+            stored = gzip.decompress(stored)
+    return Response(content=stored, media_type="application/json", headers=headers)
+
+
+def _finish_flight(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the exception as retrieved even if every waiter has gone away
+    if not task.cancelled():
+        task.exception()
+
+
+async def _single_flight(key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run load() once for all concurrent callers of key
+
+    The load runs as its own task and callers await it through shield(), so a client
+    disconnecting mid-request doesn't cancel the fetch the other callers are waiting on.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(load())
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_finish_flight, key))
+    return await asyncio.shield(task)
+
+
+async def _load(key: str, ttl: int, func: Callable, args: tuple, kwargs: dict) -> bytes | Response:
+    """Call the handler and store its result; Response objects are passed through uncached"""
+    result = await func(*args, **kwargs)
+    if isinstance(result, Response):
+        return result
+    content = _encode(orjson.dumps(result))
+    await backend.set(key, content, ttl)
+    return content
+
+
+async def _refresh(key: str, ttl: int, func: Callable, args: tuple, kwargs: dict) -> None:
+    try:
+        await asyncio.sleep(REFRESH_DELAY)
+        await _load(key, ttl, func, args, kwargs)
+    except Exception as e:
+        logger.info("Background refresh failed for %s: %s", key, e)
+    finally:
+        _refreshing.discard(key)
+
+
+def _schedule_refresh(key: str, ttl: int, func: Callable, args: tuple, kwargs: dict) -> None:
+    """Retry the upstream in the background, at most once at a time per key"""
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+    task = asyncio.create_task(_refresh(key, ttl, func, args, kwargs))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def cached(
+    ttl: int,
+    namespace: str | None = None,
+    key_builder: Callable[..., str] | None = None,
+    max_age: int | None = None,
+    public: bool = True,
+) -> Callable:
+    """
+    Decorator caching a GET handler's JSON result for ttl seconds
+
+    Responses carry an ETag and Cache-Control headers so browsers and CDNs can reuse them;
+    a request whose If-None-Match matches the cached entry gets an empty 304. The decorated
+    handler gets a warm(path, **kwargs) coroutine for filling its entry outside a request.
+
+    Args:
+        ttl: Lifetime of a cached response in seconds
+        namespace: Key prefix used by invalidate(); defaults to the handler name
+        key_builder: Optional function called with the handler's arguments that returns
+            the cache key, for routes whose equivalent requests differ in spelling
+        max_age: Cache-Control max-age for clients and CDNs; defaults to ttl
+        public: Whether shared caches (proxies, CDNs) may store the response; pass False
+            for account-scoped routes so only the requesting client's cache keeps it
+    """
+
+    def decorator(func: Callable) -> Callable:
+        key_namespace = namespace or func.__name__
+        client_max_age = ttl if max_age is None else max_age
+        signature = inspect.signature(func)
+        # FastAPI only passes the Request if the signature asks for it
+        inject_request = "request" not in signature.parameters
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request = kwargs.pop("request") if inject_request else kwargs["request"]
+            custom_key = key_builder(**kwargs) if key_builder is not None else None
+            key = _cache_key(key_namespace, request, custom_key)
+
+            content = await backend.get(key)
+            if content is not None:
+                return _json_response(content, "HIT", request, client_max_age, ttl, public)
+
+            try:
+                outcome = await _single_flight(key, lambda: _load(key, ttl, func, args, kwargs))
+            except Exception as e:
+                # Client errors are the caller's fault; a stale copy wouldn't be any more right
+                if isinstance(e, HTTPException) and e.status_code < 500:
+                    raise
+                content = await backend.get_stale(key)
+                if content is None:
+                    raise
+                logger.warning(
+                    "Serving stale response for %s after upstream failure: %s",
+                    request.url.path, e,
+                )
+                _schedule_refresh(key, ttl, func, args, kwargs)
+                return _json_response(content, "STALE", request, client_max_age, ttl, public)
+
+            if isinstance(outcome, Response):
+                return outcome
+            return _json_response(outcome, "MISS", request, client_max_age, ttl, public)
+
+        async def warm(path: str, **kwargs: Any) -> None:
+            """
+            Fetch and store the entry a plain GET of path (no query string) would use,
+            whether or not it is currently cached; kwargs are the handler's arguments
+            """
+            request = Request(
+                {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+            )
+            custom_key = key_builder(**kwargs) if key_builder is not None else None
+            key = _cache_key(key_namespace, request, custom_key)
+            if not inject_request:
+                kwargs["request"] = request
+            await _single_flight(key, lambda: _load(key, ttl, func, (), kwargs))
+
+        wrapper.warm = warm
+
+        if inject_request:
+            parameters = [
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ]
+            wrapper.__signature__ = signature.replace(parameters=parameters)
+
+        return wrapper
+
+    return decorator
+
+
+async def cached_call(
+    namespace: str, key: str, ttl: int, fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Return the cached value for key, or await fetch() and cache a non-empty result
+
+    The value-level counterpart of cached(), for handlers that fan out to many items
+    (batch routes) and want each item cached on its own
+    """
+    cache_key = _make_key(namespace, key)
+    content = await backend.get(cache_key)
+    if content is not None:
+        return orjson.loads(_decode(content))
+
+    async def load() -> Any:
+        result = await fetch()
+        if result:
+            await backend.set(cache_key, _encode(orjson.dumps(result)), ttl)
+        return result
+
+    return await _single_flight(cache_key, load)
+
+
+async def coalesce(namespace: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Await fetch() once for all concurrent callers passing the same namespace and key
+
+    Nothing is stored; for upstream calls shared by requests that are cached separately
+    (say, the same search rendered two ways) or that shouldn't be cached at all
+    """
+    return await _single_flight(f"flight:{namespace}:{key}", fetch)
+
+
+async def invalidate(namespace: str) -> None:
+    """Drop every cached response stored under namespace"""
+    await backend.delete_prefix(f"resp:{namespace}:")
\ No newline at end of file
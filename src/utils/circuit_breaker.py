@@ -0,0 +1,94 @@
+"""
+Circuit breaker for YouTube Music call paths
+
+When YouTube Music breaks (its response structure changes, or it keeps answering 5xx),
+every request otherwise still waits for a full upstream round trip before failing. After
+fail_max consecutive failures a breaker opens and rejects calls with a 503 straight away
+for reset_timeout seconds. The first call after that is let through as a trial: if it
+succeeds the breaker closes, and if it fails the breaker stays open for another window.
+
+Breakers are only touched from the event loop, so they need no locking.
+"""
+
+import logging
+import math
+import re
+import time
+
+import requests
+from fastapi import HTTPException
+from ytmusicapi.exceptions import YTMusicServerError
+
+logger = logging.getLogger(__name__)
+
+# ytmusicapi reports any HTTP error as "Server returned HTTP <status>: ..."; only outages
+# and rate limiting count against the breaker, not a bad ID or missing auth
+UPSTREAM_STATUS_RE = re.compile(r"HTTP (?:5\d\d|429)\b")
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether error means YouTube Music itself is failing rather than the request"""
+    if isinstance(error, (KeyError, requests.ConnectionError, requests.Timeout)):
+        return True
+    return isinstance(error, YTMusicServerError) and bool(UPSTREAM_STATUS_RE.search(str(error)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one upstream call path"""
+
+    def __init__(self, name: str, fail_max: int, reset_timeout: float):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise a 503 while the breaker is open, letting a single trial call through after"""
+        if self._opened_at is None:
+            return
+        remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+        if remaining <= 0 and not self._trial:
+            self._trial = True
+            return
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "upstream_unavailable",
+                "message": "YouTube Music is failing for this operation; try again shortly",
+                "operation": self.name,
+            },
+            headers={"Retry-After": str(max(1, math.ceil(remaining)))},
+        )
+
+    def record(self, error: BaseException | None) -> None:
+        """Record the outcome of a call that before_call() let through"""
+        if error is None or not is_upstream_failure(error):
+            if self._opened_at is not None:
+                logger.info("Circuit for %s closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+            return
+
+        self._failures += 1
+        if self._trial or (self._opened_at is None and self._failures >= self.fail_max):
+            logger.warning(
+                "Circuit for %s opened for %ss after %d consecutive failures",
+                self.name, self.reset_timeout, self._failures,
+            )
+            self._opened_at = time.monotonic()
+            self._trial = False
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before its outcome was known"""
+        self._trial = False
\ No newline at end of file
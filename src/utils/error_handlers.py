@@ -3,6 +3,7 @@ Comprehensive error handling utilities for YTMusic API wrapper
 """
 
 import logging
+import re
 from functools import wraps
 from typing import Any, Callable
 
@@ -10,6 +11,16 @@ from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
+# Failure kinds recognised by YTMusicErrorHandler, checked in this order
+COMMON_ERROR_RE = re.compile(
+    r"(?P<auth>auth|login|unauthorized|credentials)"
+    r"|(?P<not_found>not found|unavailable|does not exist)"
+    r"|(?P<forbidden>permission|forbidden|access denied)"
+    r"|(?P<rate_limited>quota|limit|rate|too many requests)"
+    r"|(?P<invalid>invalid|format|unsupported|malformed)",
+    re.IGNORECASE,
+)
+
 
 class YTMusicErrorHandler:
     """Centralized error handling for YTMusic API operations"""
@@ -24,46 +35,100 @@ class YTMusicErrorHandler:
             identifier: Optional identifier (like videoId, channelId) for context
         """
 
+        # Only the exception text varies between failures, so every other part of the
+        # error details is built once per decorated handler instead of on each failure
+        friendly_name = operation_name.replace("_", " ")
+        log_context = f" for {identifier}" if identifier else ""
+        structure_changed = {
+            "error": "API structure changed",
+            "message": "YouTube Music changed their response structure. This is a known issue that occurs when YouTube updates their API.",
+            "operation": operation_name,
+            "solution": "Try again later or use simpler search parameters",
+        }
+        parsing_error = {
+            "error": "API parsing error",
+            "message": f"YouTube Music API structure has changed, {friendly_name} temporarily unavailable",
+            "operation": operation_name,
+        }
+        identifier_context = {"identifier": identifier} if identifier else {}
+        connection_failed = {
+            "error": "Connection failed",
+            "message": "Unable to connect to YouTube Music. Please check your internet connection.",
+            "operation": operation_name,
+        }
+        timed_out = {
+            "error": "Request timeout",
+            "message": "Request to YouTube Music timed out. Please try again.",
+            "operation": operation_name,
+        }
+        by_kind = {
+            "auth": (
+                401,
+                {
+                    "error": "Authentication required",
+                    "message": f"Authentication required to access {friendly_name}",
+                    "operation": operation_name,
+                },
+            ),
+            "not_found": (
+                404,
+                {
+                    "error": "Not found",
+                    "message": (
+                        f"Content with ID {identifier} not found or unavailable"
+                        if identifier
+                        else f"{friendly_name.title()} not found"
+                    ),
+                    "operation": operation_name,
+                    "identifier": identifier,
+                },
+            ),
+            "forbidden": (
+                403,
+                {
+                    "error": "Access forbidden",
+                    "message": f"You don't have permission to access {friendly_name}",
+                    "operation": operation_name,
+                },
+            ),
+            "rate_limited": (
+                429,
+                {
+                    "error": "Rate limit exceeded",
+                    "message": "API rate limit exceeded. Please try again later.",
+                    "operation": operation_name,
+                    "retry_after": "60",  # Suggest waiting 60 seconds
+                },
+            ),
+        }
+        unexpected = {
+            "error": "Internal server error",
+            "message": f"An unexpected error occurred while {friendly_name}",
+            "operation": operation_name,
+            "identifier": identifier,
+        }
+
         def decorator(func: Callable) -> Callable:
             @wraps(func)
             async def wrapper(*args, **kwargs):
                 try:
                     return await func(*args, **kwargs)
 
+                except HTTPException:
+                    raise  # Re-raise HTTP exceptions as they are
+
                 except KeyError as e:
-                    import traceback
-                    error_traceback = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
                     logger.error(
-                        f"KeyError in {operation_name}{f' for {identifier}' if identifier else ''}: {str(e)}\n"
-                        f"Traceback:\n{error_traceback}"
+                        "KeyError in %s%s: %s", operation_name, log_context, e, exc_info=e
                     )
 
                     # Provide more specific error messages based on the KeyError
-                    if "header" in str(e):
-                        detail = {
-                            "error": "API structure changed",
-                            "message": "YouTube Music changed their response structure. This is a known issue that occurs when YouTube updates their API.",
-                            "operation": operation_name,
-                            "solution": "Try again later or use simpler search parameters",
-                            "technical_details": str(e),
-                        }
-                    else:
-                        detail = {
-                            "error": "API parsing error",
-                            "message": f"YouTube Music API structure has changed, {operation_name.replace('_', ' ')} temporarily unavailable",
-                            "operation": operation_name,
-                            "technical_details": str(e),
-                        }
-
-                    if identifier:
-                        detail["identifier"] = identifier
-
+                    base = structure_changed if "header" in str(e) else parsing_error
+                    detail = {**base, "technical_details": str(e), **identifier_context}
                     raise HTTPException(status_code=503, detail=detail)
 
                 except ValueError as e:
-                    logger.error(
-                        f"ValueError in {operation_name}{f' for {identifier}' if identifier else ''}: {str(e)}"
-                    )
+                    logger.error("ValueError in %s%s: %s", operation_name, log_context, e)
                     raise HTTPException(
                         status_code=400,
                         detail={
@@ -75,107 +140,27 @@ class YTMusicErrorHandler:
                     )
 
                 except ConnectionError as e:
-                    logger.error(f"ConnectionError in {operation_name}: {str(e)}")
-                    raise HTTPException(
-                        status_code=503,
-                        detail={
-                            "error": "Connection failed",
-                            "message": "Unable to connect to YouTube Music. Please check your internet connection.",
-                            "operation": operation_name,
-                        },
-                    )
+                    logger.error("ConnectionError in %s: %s", operation_name, e)
+                    raise HTTPException(status_code=503, detail=connection_failed)
 
                 except TimeoutError as e:
-                    logger.error(f"TimeoutError in {operation_name}: {str(e)}")
-                    raise HTTPException(
-                        status_code=504,
-                        detail={
-                            "error": "Request timeout",
-                            "message": "Request to YouTube Music timed out. Please try again.",
-                            "operation": operation_name,
-                        },
-                    )
+                    logger.error("TimeoutError in %s: %s", operation_name, e)
+                    raise HTTPException(status_code=504, detail=timed_out)
 
                 except Exception as e:
-                    import traceback
-                    error_traceback = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
                     logger.error(
-                        f"Unexpected error in {operation_name}{f' for {identifier}' if identifier else ''}: "
-                        f"{type(e).__name__}: {str(e)}\n"
-                        f"Traceback:\n{error_traceback}"
+                        "Unexpected error in %s%s: %s: %s",
+                        operation_name, log_context, type(e).__name__, e,
+                        exc_info=e,
                     )
 
-                    error_message = str(e).lower()
-
-                    # Authentication errors
-                    if any(
-                        keyword in error_message
-                        for keyword in ["auth", "login", "unauthorized", "credentials"]
-                    ):
-                        raise HTTPException(
-                            status_code=401,
-                            detail={
-                                "error": "Authentication required",
-                                "message": f"Authentication required to access {operation_name.replace('_', ' ')}",
-                                "operation": operation_name,
-                            },
-                        )
-
-                    # Not found errors
-                    elif any(
-                        keyword in error_message
-                        for keyword in ["not found", "unavailable", "does not exist"]
-                    ):
-                        status_code = 404
-                        if identifier:
-                            message = f"Content with ID {identifier} not found or unavailable"
-                        else:
-                            message = f"{operation_name.replace('_', ' ').title()} not found"
-
-                        raise HTTPException(
-                            status_code=status_code,
-                            detail={
-                                "error": "Not found",
-                                "message": message,
-                                "operation": operation_name,
-                                "identifier": identifier,
-                            },
-                        )
-
-                    # Permission/access errors
-                    elif any(
-                        keyword in error_message
-                        for keyword in ["permission", "forbidden", "access denied"]
-                    ):
-                        raise HTTPException(
-                            status_code=403,
-                            detail={
-                                "error": "Access forbidden",
-                                "message": f"You don't have permission to access {operation_name.replace('_', ' ')}",
-                                "operation": operation_name,
-                            },
-                        )
-
-                    # Rate limiting errors
-                    elif any(
-                        keyword in error_message
-                        for keyword in ["quota", "limit", "rate", "too many requests"]
-                    ):
-                        raise HTTPException(
-                            status_code=429,
-                            detail={
-                                "error": "Rate limit exceeded",
-                                "message": "API rate limit exceeded. Please try again later.",
-                                "operation": operation_name,
-                                "retry_after": "60",  # Suggest waiting 60 seconds
-                            },
-                        )
+                    kind = match_error(COMMON_ERROR_RE, e)
+                    if kind in by_kind:
+                        status_code, detail = by_kind[kind]
+                        raise HTTPException(status_code=status_code, detail=detail)
 
                     # Invalid format/parameter errors
-                    elif any(
-                        keyword in error_message
-                        for keyword in ["invalid", "format", "unsupported", "malformed"]
-                    ):
+                    if kind == "invalid":
                         raise HTTPException(
                             status_code=400,
                             detail={
@@ -187,16 +172,7 @@ class YTMusicErrorHandler:
                         )
 
                     # Generic server error
-                    else:
-                        raise HTTPException(
-                            status_code=500,
-                            detail={
-                                "error": "Internal server error",
-                                "message": f"An unexpected error occurred while {operation_name.replace('_', ' ')}",
-                                "operation": operation_name,
-                                "identifier": identifier,
-                            },
-                        )
+                    raise HTTPException(status_code=500, detail=unexpected)
 
             return wrapper
 
@@ -246,3 +222,113 @@ def handle_playlist_errors(func):
 def handle_upload_errors(func):
     """Decorator specifically for upload operations"""
     return YTMusicErrorHandler.handle_common_errors("upload_operation")(func)
+
+
+# (markers, status_code, detail): raise status_code with detail when the error message
+# contains any marker (case-insensitive); detail is formatted with the handler's arguments
+# and {error}
+ErrorRule = tuple[tuple[str, ...], int, str]
+
+
+def match_error(pattern: re.Pattern, error: Exception) -> str | None:
+    """
+    Return the first-declared named group of pattern found anywhere in the error message
+
+    Classifies the message in a single scan instead of one substring search per keyword;
+    when several groups match, declaration order decides, as an if/elif chain would.
+    """
+    found = {match.lastgroup for match in pattern.finditer(str(error))}
+    found.discard(None)
+    if not found:
+        return None
+    return min(found, key=pattern.groupindex.__getitem__)
+
+
+def _compile_rules(errors: tuple[ErrorRule, ...]) -> re.Pattern | None:
+    if not errors:
+        return None
+    return re.compile(
+        "|".join(
+            f"(?P<rule{index}>{'|'.join(map(re.escape, markers))})"
+            for index, (markers, _, _) in enumerate(errors)
+        ),
+        re.IGNORECASE,
+    )
+
+
+def ytmusic_endpoint(
+    resource: str,
+    id_param: str | None = None,
+    errors: tuple[ErrorRule, ...] = (),
+    action: str = "fetching",
+) -> Callable:
+    """
+    Decorator mapping ytmusicapi failures in a route handler onto the API's error responses
+
+    HTTPExceptions raised by the handler pass through, KeyErrors (YouTube Music changed
+    its response structure) become 503, and anything else becomes the first matching
+    rule in errors or a 500.
+
+    Args:
+        resource: What the route returns, used in error messages ("album data", "lyrics")
+        id_param: Name of the handler argument identifying the item, echoed in error details
+        errors: Ordered rules for non-KeyError failures, e.g. a 404 for "not found"
+        action: Verb used in the 500 message ("An unexpected error occurred while fetching ...")
+    """
+
+    rules_pattern = _compile_rules(errors)
+    structure_message = (
+        f"YouTube Music API structure has changed, {resource} temporarily unavailable"
+    )
+    unexpected_message = f"An unexpected error occurred while {action} {resource}"
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+
+            except HTTPException:
+                raise  # Re-raise HTTP exceptions as they are
+
+            except KeyError as e:
+                identifier = kwargs.get(id_param) if id_param else None
+                if id_param:
+                    logger.error("KeyError in %s for %s: %s", func.__name__, identifier, e)
+                else:
+                    logger.error("KeyError in %s: %s", func.__name__, e)
+
+                detail = {
+                    "error": "API structure error",
+                    "message": structure_message,
+                }
+                if id_param:
+                    detail[id_param] = identifier
+                detail["technical_details"] = str(e)
+                raise HTTPException(status_code=503, detail=detail) from e
+
+            except Exception as e:
+                identifier = kwargs.get(id_param) if id_param else None
+                if id_param:
+                    logger.error("Unexpected error in %s for %s: %s", func.__name__, identifier, e)
+                else:
+                    logger.error("Unexpected error in %s: %s", func.__name__, e)
+
+                rule = match_error(rules_pattern, e) if rules_pattern is not None else None
+                if rule is not None:
+                    _, status_code, detail = errors[int(rule.removeprefix("rule"))]
+                    raise HTTPException(
+                        status_code=status_code, detail=detail.format(**kwargs, error=e)
+                    ) from e
+
+                detail = {
+                    "error": "Internal server error",
+                    "message": unexpected_message,
+                }
+                if id_param:
+                    detail[id_param] = identifier
+                raise HTTPException(status_code=500, detail=detail) from e
+
+        return wrapper
+
+    return decorator
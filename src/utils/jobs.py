@@ -0,0 +1,95 @@
+"""
+Background jobs for slow upstream enumerations
+
+A job runs as a task on the worker that accepted it. With REDIS_URL set its state (and
+result) is a plain Redis key expiring after JOB_TTL, so any worker can answer the status
+poll. Without Redis, state lives in a dict of this process, and polls have to reach the
+same worker process, which holds for single-worker deployments.
+
+Jobs are kept out of the response cache: they need no stale copy, and a busy response
+LRU must not evict a job that is still running.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+import orjson
+
+from src.utils import cache
+
+logger = logging.getLogger(__name__)
+
+# How long a job's state (and result) stays available for polling
+JOB_TTL = 60 * 60
+
+# Strong references so running jobs aren't garbage collected
+_tasks: set[asyncio.Task] = set()
+
+# Job state without Redis: key -> (serialized state, monotonic expiry)
+_local_jobs: dict[str, tuple[bytes, float]] = {}
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _redis() -> cache.RedisCache | None:
+    # Job state changes while clients poll it, so the in-process tier in front of Redis
+    # is skipped; it would keep serving a worker's first-seen state for L1_TTL
+    store = getattr(cache.backend, "l2", None)
+    return store if isinstance(store, cache.RedisCache) else None
+
+
+async def _save(job_id: str, state: dict) -> None:
+    value = orjson.dumps(state)
+    redis = _redis()
+    if redis is not None:
+        await redis.set(_job_key(job_id), value, JOB_TTL, keep_stale=False)
+        return
+
+    now = time.monotonic()
+    for key in [key for key, (_, expires) in _local_jobs.items() if expires <= now]:
+        del _local_jobs[key]
+    _local_jobs[_job_key(job_id)] = (value, now + JOB_TTL)
+
+
+async def _run(job_id: str, operation: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+    await _save(job_id, {"task_id": job_id, "operation": operation, "status": "RUNNING"})
+    try:
+        result = await fetch()
+    except Exception as e:
+        logger.warning("Job %s (%s) failed: %s", job_id, operation, e)
+        state = {
+            "task_id": job_id,
+            "operation": operation,
+            "status": "FAILURE",
+            "error": type(e).__name__,
+            "message": str(getattr(e, "detail", e)),
+        }
+    else:
+        state = {"task_id": job_id, "operation": operation, "status": "SUCCESS", "result": result}
+    await _save(job_id, state)
+
+
+async def submit(operation: str, fetch: Callable[[], Awaitable[Any]]) -> str:
+    """Start fetch() in the background and return the job ID to poll with get_job()"""
+    job_id = uuid.uuid4().hex
+    await _save(job_id, {"task_id": job_id, "operation": operation, "status": "PENDING"})
+    task = asyncio.create_task(_run(job_id, operation, fetch))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job_id
+
+
+async def get_job(job_id: str) -> dict | None:
+    """Return the job's state, or None if it is unknown or has expired"""
+    redis = _redis()
+    if redis is not None:
+        stored = await redis.get(_job_key(job_id))
+    else:
+        entry = _local_jobs.get(_job_key(job_id))
+        stored = entry[0] if entry is not None and entry[1] > time.monotonic() else None
+    return orjson.loads(stored) if stored is not None else None
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+Newline-delimited JSON responses for large listings
+
+Items are encoded one at a time as the client reads, so a long list never exists as a
+single serialized buffer and clients can start processing after the first line.
+"""
+
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_response(items: Iterable[Any]) -> StreamingResponse:
+    """Stream items as newline-delimited JSON, one item per line"""
+    return StreamingResponse(
+        (orjson.dumps(item) + b"\n" for item in items), media_type=NDJSON_MEDIA_TYPE
+    )
\ No newline at end of file
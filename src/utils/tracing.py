@@ -0,0 +1,67 @@
+"""
+Optional OpenTelemetry tracing
+
+Setting OTEL_EXPORTER_OTLP_ENDPOINT (with opentelemetry-sdk, opentelemetry-exporter-otlp,
+opentelemetry-instrumentation-fastapi and opentelemetry-instrumentation-requests
+installed) exports one span per request and one per ytmusicapi call, plus a child span
+for each HTTP request ytmusicapi sends. The time a ytmusic.* span spends outside its HTTP
+children is ytmusicapi's own JSON decoding and parsing, and the HTTP span shows the
+network side.
+
+Without the variable or the packages, span() hands back a no-op context manager and
+tracing costs nothing.
+"""
+
+import logging
+import os
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+_tracer: Any = None
+_provider: Any = None
+
+
+def setup_tracing(app: FastAPI) -> None:
+    """Instrument app and start exporting spans when OTEL_EXPORTER_OTLP_ENDPOINT is set"""
+    global _tracer, _provider
+    if not os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.requests import RequestsInstrumentor
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set but OpenTelemetry is not installed; "
+            "tracing disabled"
+        )
+        return
+
+    # The endpoint, headers and service name are read from the standard OTEL_* variables
+    _provider = TracerProvider()
+    _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(_provider)
+    FastAPIInstrumentor.instrument_app(app)
+    RequestsInstrumentor().instrument()
+    _tracer = trace.get_tracer(__name__)
+    logger.info("Exporting traces to %s", os.environ["OTEL_EXPORTER_OTLP_ENDPOINT"])
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager:
+    """Start a span as a child of the current one, or do nothing when tracing is off"""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def shutdown_tracing() -> None:
+    """Flush spans still waiting in the export queue; called on application shutdown"""
+    if _provider is not None:
+        _provider.shutdown()
\ No newline at end of file
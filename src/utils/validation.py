@@ -0,0 +1,33 @@
+"""
+Shape checks for YouTube Music identifiers
+
+Routes call these before going upstream, so an ID that can't possibly resolve is
+rejected locally with a 400 instead of costing a YouTube Music round trip.
+"""
+
+import re
+
+from fastapi import HTTPException
+
+# Channel IDs are UC + 22 characters; artist browse IDs may carry an MPLA prefix
+CHANNEL_ID_RE = re.compile(r"^(?:MPLA)?UC[A-Za-z0-9_-]{22}$")
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+ALBUM_BROWSE_ID_RE = re.compile(r"^MPREb_[A-Za-z0-9_-]+$")
+# Related content is looked up by video ID or by the MPTRt_ browse ID a watch playlist returns
+SONG_RELATED_ID_RE = re.compile(r"^(?:[A-Za-z0-9_-]{11}|MPTRt_[A-Za-z0-9_-]+)$")
+# Playlist IDs vary in prefix and length (LM, RDPN, PL..., OLAK5uy_..., MPSPP...), so only
+# the alphabet and a sane length are checked
+PLAYLIST_ID_RE = re.compile(r"^[A-Za-z0-9_-]{2,128}$")
+
+
+def validate_id(value: str, pattern: re.Pattern, param: str, kind: str) -> None:
+    """Raise a 400 when value doesn't have the shape pattern describes"""
+    if pattern.match(value) is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Invalid ID",
+                "message": f"'{value}' is not a valid {kind}",
+                param: value,
+            },
+        )
\ No newline at end of file
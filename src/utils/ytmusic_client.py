@@ -0,0 +1,377 @@
+"""
+Shared YTMusic clients for the routers
+
+ytmusicapi is synchronous and its requests.Session is not thread-safe, so each worker
+thread lazily builds one YTMusic instance and keeps it for the life of the process.
+The session behind it pools keep-alive connections, so consecutive calls reuse the
+TCP+TLS connection to music.youtube.com instead of handshaking on every request.
+
+Async handlers go through run_ytmusic(), which runs the call on a dedicated thread pool
+so the event loop keeps serving other requests while YouTube Music responds.
+
+Calls are admitted through a token bucket (YTMUSIC_RATE calls per second, bursts of up
+to YTMUSIC_BURST) so batch routes and cache refreshes queue up instead of flooding YouTube
+Music into 429s; an occasional 429 that still slips through is retried with backoff.
+
+Reads and writes are also kept apart: reads may occupy at most YTMUSIC_READ_CONCURRENCY
+pool threads and writes at most YTMUSIC_WRITE_CONCURRENCY. A burst of searches
+therefore waits on the event loop instead of queueing ahead of account changes in the pool.
+
+Every ytmusicapi method has its own circuit breaker, so when YouTube Music keeps failing
+one operation, calls to it fail fast with a 503 and the others are unaffected.
+
+Setting YTMUSIC_HTTP2=1 (with the h2 package installed) routes those calls through an
+HTTP/2 httpx client instead. httpx clients are thread-safe, so every pool thread shares
+one per process and concurrent calls multiplex over a single connection rather than
+each thread holding its own HTTP/1.1 connections.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from ytmusicapi import YTMusic
+
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Same per-request timeout ytmusicapi applies to the sessions it creates itself
+REQUEST_TIMEOUT = 30
+
+# Upstream calls are I/O bound, so a wide pool keeps many requests in flight per worker.
+# The pool is separate from anyio's default one, so slow YouTube Music calls can't starve
+# FastAPI's own sync work (sync dependencies, file responses) of threads
+MAX_WORKERS = int(os.environ.get("YTMUSIC_WORKERS", "32"))
+
+# Outbound call rate per worker process; YTMUSIC_RATE=0 disables the limiter
+RATE_LIMIT = float(os.environ.get("YTMUSIC_RATE", "20"))
+RATE_BURST = int(os.environ.get("YTMUSIC_BURST", "40"))
+
+# Calls that change account state (ratings, subscriptions, history) are what YouTube
+# flags as automated, so they're paced far more tightly on top of the shared limit
+WRITE_RATE_LIMIT = float(os.environ.get("YTMUSIC_WRITE_RATE", "2"))
+WRITE_RATE_BURST = int(os.environ.get("YTMUSIC_WRITE_BURST", "5"))
+
+# Bulkheads over the pool; by default writes keep 4 threads that reads can never take
+WRITE_CONCURRENCY = int(os.environ.get("YTMUSIC_WRITE_CONCURRENCY", "4"))
+READ_CONCURRENCY = int(
+    os.environ.get("YTMUSIC_READ_CONCURRENCY", str(max(1, MAX_WORKERS - WRITE_CONCURRENCY)))
+)
+
+# Consecutive upstream failures that open a circuit, and how long it stays open (seconds);
+# YTMUSIC_BREAKER_FAILURES=0 disables the breakers
+BREAKER_FAIL_MAX = int(os.environ.get("YTMUSIC_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("YTMUSIC_BREAKER_RESET", "30"))
+
+HTTP2_ENABLED = os.environ.get("YTMUSIC_HTTP2", "").lower() in ("1", "true", "yes")
+
+# Keep-alive pool per session: hosts pooled, and connections kept open per host
+POOL_CONNECTIONS = 20
+POOL_MAXSIZE = 50
+
+
+class TokenBucket:
+    """
+    Async token bucket: rate tokens per second, holding at most burst
+
+    A caller that finds the bucket empty still takes its token, driving the balance
+    negative, and sleeps until that token would have been refilled. Callers are therefore
+    served in arrival order without a lock, since nothing awaits between reading and
+    updating the balance.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+_bucket = TokenBucket(RATE_LIMIT, RATE_BURST) if RATE_LIMIT > 0 else None
+_write_bucket = (
+    TokenBucket(WRITE_RATE_LIMIT, WRITE_RATE_BURST) if WRITE_RATE_LIMIT > 0 else None
+)
+_read_slots = asyncio.Semaphore(READ_CONCURRENCY)
+_write_slots = asyncio.Semaphore(WRITE_CONCURRENCY)
+_breakers: dict[str, CircuitBreaker] = {}
+_local = threading.local()
+_sessions: list[requests.Session] = []
+_sessions_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_http2_client: httpx.Client | None = None
+
+
+class Http2Session(requests.Session):
+    """
+    requests.Session facade over an HTTP/2 httpx.Client
+
+    ytmusicapi only accepts a requests.Session and only calls get()/post(), reading
+    status_code, reason and text from the result, so requests are forwarded to httpx
+    and its responses converted back. Proxies are not supported. The httpx client is
+    not owned by the session and outlives close().
+    """
+
+    def __init__(self, client: httpx.Client):
+        super().__init__()
+        self._client = client
+
+    def request(self, method, url, params=None, data=None, headers=None, cookies=None,
+                json=None, timeout=None, **kwargs) -> requests.Response:
+        headers = dict(headers or {})
+        if cookies:
+            # httpx deprecates per-request cookies, so send them as a header instead
+            cookie_header = "; ".join(f"{name}={value}" for name, value in cookies.items())
+            existing = headers.pop("cookie", None) or headers.pop("Cookie", None)
+            headers["Cookie"] = f"{existing}; {cookie_header}" if existing else cookie_header
+
+        upstream = self._client.request(
+            method,
+            url,
+            params=params,
+            content=data,
+            json=json,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(upstream.headers)
+        response.url = str(upstream.url)
+        response.encoding = upstream.encoding
+        response._content = upstream.content
+        return response
+
+
+def _get_http2_client() -> httpx.Client:
+    """Return the process-wide HTTP/2 client, creating it on first use"""
+    global _http2_client
+    client = _http2_client
+    if client is None:
+        with _sessions_lock:
+            if _http2_client is None:
+                _http2_client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                    timeout=REQUEST_TIMEOUT,
+                    transport=httpx.HTTPTransport(http2=True, retries=2),
+                )
+            client = _http2_client
+    return client
+
+
+def _build_session() -> requests.Session:
+    """Create a pooled session with a small retry budget for connection errors"""
+    if HTTP2_ENABLED:
+        try:
+            return Http2Session(_get_http2_client())
+        except ImportError:
+            logger.warning("YTMUSIC_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        # The same session sends writes (create_playlist, rate_song, ...), so only failures
+        # where YouTube Music can't have acted on the request are retried: connection
+        # errors, and 429s (honouring Retry-After). A read timeout or dropped response is
+        # never resent, since the POST may already have gone through
+        max_retries=Retry(
+            total=2,
+            read=0,
+            other=0,
+            backoff_factor=0.2,
+            backoff_jitter=0.1,
+            status_forcelist=(429,),
+            allowed_methods=None,
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.request = functools.partial(session.request, timeout=REQUEST_TIMEOUT)
+    return session
+
+
+def get_ytmusic() -> YTMusic:
+    """Return the YTMusic client owned by the calling thread, creating it on first use"""
+    ytmusic = getattr(_local, "ytmusic", None)
+    if ytmusic is None:
+        session = _build_session()
+        with _sessions_lock:
+            _sessions.append(session)
+        ytmusic = YTMusic(requests_session=session)
+        _local.ytmusic = ytmusic
+    return ytmusic
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool dedicated to ytmusicapi calls, creating it on first use"""
+    global _executor
+    executor = _executor
+    if executor is None:
+        with _sessions_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_WORKERS, thread_name_prefix="ytmusic"
+                )
+            executor = _executor
+    return executor
+
+
+def _call_with_client(func: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    with span(f"ytmusic.{getattr(func, '__name__', 'call')}"):
+        return func(get_ytmusic(), *args, **kwargs)
+
+
+def _breaker_for(func: Callable) -> CircuitBreaker | None:
+    if BREAKER_FAIL_MAX <= 0:
+        return None
+    name = getattr(func, "__name__", "ytmusic")
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, BREAKER_FAIL_MAX, BREAKER_RESET_TIMEOUT)
+    return breaker
+
+
+async def _run_in_pool(func: Callable[..., T], buckets: tuple[TokenBucket | None, ...],
+                       slots: asyncio.Semaphore, breaker: CircuitBreaker | None,
+                       args: tuple, kwargs: dict) -> T:
+    try:
+        for bucket in buckets:
+            if bucket is not None:
+                await bucket.acquire()
+        await slots.acquire()
+    except BaseException:
+        # Cancelled while still queued: hand back a half-open trial that before_call() gave
+        # out, or the circuit would reject every later call waiting for its outcome
+        if breaker is not None:
+            breaker.abandon()
+        raise
+
+    try:
+        loop = asyncio.get_running_loop()
+        # run_in_executor doesn't carry context over to the thread; running the call in a
+        # copy keeps its trace span under the request's span
+        context = contextvars.copy_context()
+        try:
+            result = await loop.run_in_executor(
+                _get_executor(),
+                functools.partial(context.run, _call_with_client, func, args, kwargs),
+            )
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.abandon()
+            raise
+        except Exception as e:
+            if breaker is not None:
+                breaker.record(e)
+            raise
+    finally:
+        slots.release()
+    if breaker is not None:
+        breaker.record(None)
+    return result
+
+
+async def run_ytmusic(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking ytmusicapi call on the dedicated thread pool
+
+    func is called as func(ytmusic, *args, **kwargs) with the pool thread's own client, so
+    it can be an unbound method such as YTMusic.get_album or a helper chaining several calls.
+    Raises a 503 HTTPException without calling func while its circuit is open.
+    """
+    breaker = _breaker_for(func)
+    if breaker is not None:
+        breaker.before_call()
+    return await _run_in_pool(func, (_bucket,), _read_slots, breaker, args, kwargs)
+
+
+async def run_ytmusic_write(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """run_ytmusic() for calls that change account state, paced by the stricter write limit"""
+    breaker = _breaker_for(func)
+    if breaker is not None:
+        breaker.before_call()
+    return await _run_in_pool(
+        func, (_write_bucket, _bucket), _write_slots, breaker, args, kwargs
+    )
+
+
+def breaker_states() -> dict[str, str]:
+    """State of every circuit breaker used so far, for health checks"""
+    return {name: breaker.state for name, breaker in sorted(_breakers.items())}
+
+
+def pool_stats() -> dict[str, Any]:
+    """
+    Summarise the upstream connection pools for health checks
+
+    With keep-alive working, requests_sent grows much faster than connections_opened.
+    Both are only tracked for the HTTP/1.1 sessions.
+    """
+    with _sessions_lock:
+        sessions = _sessions[:]
+    stats: dict[str, Any] = {
+        "transport": "http2" if _http2_client is not None else "http1.1",
+        "clients": len(sessions),
+        "max_workers": MAX_WORKERS,
+        "pool_maxsize": POOL_MAXSIZE,
+        "read_concurrency": READ_CONCURRENCY,
+        "write_concurrency": WRITE_CONCURRENCY,
+    }
+    connections = requests_sent = 0
+    for session in sessions:
+        adapter = session.adapters.get("https://")
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+    stats["connections_opened"] = connections
+    stats["requests_sent"] = requests_sent
+    return stats
+
+
+def shutdown() -> None:
+    """Stop the thread pool and close every pooled session; called on application shutdown"""
+    global _executor, _http2_client
+    with _sessions_lock:
+        executor, _executor = _executor, None
+        http2_client, _http2_client = _http2_client, None
+        sessions = _sessions[:]
+        _sessions.clear()
+    if executor is not None:
+        executor.shutdown(wait=False)
+    for session in sessions:
+        session.close()
+    if http2_client is not None:
+        http2_client.close()
+    logger.info("Closed %d YTMusic session(s)", len(sessions))
\ No newline at end of file
@@ -2,13 +2,15 @@
 import requests
 import json
 
+from http_session import BASE_URL, SESSION
+
+SEARCH_URL = f"{BASE_URL}/search/"
+
 def test_search_with_categories():
     """Test search endpoint with category enrichment"""
-    base_url = "http://localhost:8000"
-    
     # Test search with filter=None (all results)
     print("Testing search with filter 'all'...")
-    response = requests.get(f"{base_url}/search/", params={
+    response = SESSION.get(SEARCH_URL, params={
         "query": "nightcore",
         "limit": 10
     })
@@ -51,10 +53,8 @@ def test_search_with_categories():
 
 def test_search_without_enrichment():
     """Test search with enrichment disabled"""
-    base_url = "http://localhost:8000"
-    
     print("\n\n=== Testing WITHOUT category enrichment ===")
-    response = requests.get(f"{base_url}/search/", params={
+    response = SESSION.get(SEARCH_URL, params={
         "query": "nightcore",
         "limit": 5,
         "enrich_categories": "false"
@@ -2,29 +2,28 @@
 """
 Test the fixed song related endpoint directly
 """
+import asyncio
 import sys
 sys.path.insert(0, "src")
 
-from fastapi.testclient import TestClient
+import httpx
 from src.main import app
 
-client = TestClient(app)
-
 # Test both song IDs
 test_songs = [
     "MPTRt_J06gtxzw8Sv",  # Originally working one
     "b3rFbkFjRrA"         # Previously problematic one
 ]
 
-for song_id in test_songs:
+
+async def check_song(client, song_id):
+    response = await client.get(f"/browse/song_related/{song_id}")
+
     print(f"\n{'='*50}")
     print(f"Testing song ID: {song_id}")
     print(f"{'='*50}")
-    
-    response = client.get(f"/browse/song_related/{song_id}")
-    
     print(f"Status Code: {response.status_code}")
-    
+
     if response.status_code == 200:
         result = response.json()
         print(f"✅ SUCCESS!")
@@ -33,4 +32,16 @@ for song_id in test_songs:
         if result.get('related_content'):
             print(f"First section title: {result['related_content'][0].get('title', 'N/A')}")
     else:
-        print(f"❌ FAILED: {response.json()}")
\ No newline at end of file
+        print(f"❌ FAILED: {response.json()}")
+
+
+async def main():
+    # The songs are independent, so both lookups run at once; each prints its report
+    # in one go after its response arrives
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await asyncio.gather(*(check_song(client, song_id) for song_id in test_songs))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,19 +1,31 @@
 """
 Test script to verify improved error logging behavior
 """
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import time
 
-BASE_URL = "http://localhost:8000"
+from http_session import BASE_URL, SESSION
 
 def test_client_error_logging():
     """Test that client errors (4xx) are logged at INFO level"""
     print("Testing error logging improvements...\n")
+
+    # The probes are independent, so they're sent at once and reported in order afterwards
+    playlist_id = "VLPLR48NTfP0M0OtpJgD2obWAuQF8yk0_F77"
+    urls = [
+        f"{BASE_URL}/browse/artist/{playlist_id}",
+        f"{BASE_URL}/browse/user/{playlist_id}",
+        f"{BASE_URL}/search?query=test&filter=invalid_filter",
+        f"{BASE_URL}/search?query=test&limit=1",
+    ]
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = [executor.submit(SESSION.get, url, timeout=30) for url in urls]
+    responses = [future.result() for future in futures]
     
     # Test 1: Playlist ID on artist endpoint (should be INFO, not ERROR)
     print("1. Testing playlist ID on artist endpoint...")
-    playlist_id = "VLPLR48NTfP0M0OtpJgD2obWAuQF8yk0_F77"
-    response = requests.get(f"{BASE_URL}/browse/artist/{playlist_id}")
+    response = responses[0]
     
     if response.status_code == 400:
         print(f"   ✓ Correctly returned 400 Bad Request")
@@ -21,7 +33,6 @@ def test_client_error_logging():
         if "recommendation" in str(data):
             print(f"   ✓ Helpful error message included")
             print(f"   Response: {data['detail']}")
-        time.sleep(0.5)
     else:
         print(f"   ✗ Unexpected status code: {response.status_code}")
     
@@ -29,14 +40,13 @@ def test_client_error_logging():
     
     # Test 2: Playlist ID on user endpoint (should be INFO, not ERROR)
     print("2. Testing playlist ID on user endpoint...")
-    response = requests.get(f"{BASE_URL}/browse/user/{playlist_id}")
+    response = responses[1]
     
     if response.status_code == 400:
         print(f"   ✓ Correctly returned 400 Bad Request")
         data = response.json()
         if "recommendation" in str(data):
             print(f"   ✓ Helpful error message included")
-        time.sleep(0.5)
     else:
         print(f"   ✗ Unexpected status code: {response.status_code}")
     
@@ -44,11 +54,10 @@ def test_client_error_logging():
     
     # Test 3: Invalid search query (validation error should be INFO)
     print("3. Testing validation error...")
-    response = requests.get(f"{BASE_URL}/search?query=test&filter=invalid_filter")
+    response = responses[2]
     
     if response.status_code in [400, 422]:
         print(f"   ✓ Correctly returned {response.status_code}")
-        time.sleep(0.5)
     else:
         print(f"   ✗ Unexpected status code: {response.status_code}")
     
@@ -56,7 +65,7 @@ def test_client_error_logging():
     
     # Test 4: Valid request (should be INFO for normal operations)
     print("4. Testing valid request...")
-    response = requests.get(f"{BASE_URL}/search?query=test&limit=1")
+    response = responses[3]
     
     if response.status_code == 200:
         print(f"   ✓ Successfully returned 200 OK")
@@ -1,50 +1,97 @@
+import asyncio
+import os
+import sys
+
 from ytmusicapi import YTMusic
 
-yt = YTMusic()
-
-# Test problematic song ID
-song_id = "b3rFbkFjRrA"
-
-print(f"Testing problematic song ID: {song_id}")
-
-# Test 1: Direct get_song_related
-try:
-    related = yt.get_song_related(song_id)
-    print("✅ Direct get_song_related: SUCCESS")
-    print(f"Found {len(related)} related sections")
-except Exception as e:
-    print(f"❌ Direct get_song_related: FAILED - {e}")
-
-# Test 2: Get song info first
-try:
-    song = yt.get_song(song_id)
-    print(f"✅ get_song keys: {list(song.keys()) if song else 'None'}")
-except Exception as e:
-    print(f"❌ get_song: FAILED - {e}")
-
-# Test 3: Try watch playlist approach
-try:
-    playlist = yt.get_watch_playlist(song_id)
-    print(f"✅ get_watch_playlist keys: {list(playlist.keys()) if playlist else 'None'}")
-    if playlist and 'related' in playlist:
-        print("Has 'related' key in watch playlist")
-        if playlist['related']:
-            print(f"Related browse ID: {playlist['related']}")
-except Exception as e:
-    print(f"❌ get_watch_playlist: FAILED - {e}")
-
-# Test 4: Try with MPLA prefix (common for browse IDs)
-try:
-    browse_id = f"MPLA{song_id}"
-    related = yt.get_song_related(browse_id)
-    print(f"✅ MPLA prefix worked! Found {len(related)} related sections")
-except Exception as e:
-    print(f"❌ MPLA prefix: FAILED - {e}")
-
-# Test 5: Try with VL prefix (common for playlists)
-try:
-    browse_id = f"VL{song_id}"
-    related = yt.get_song_related(browse_id)
-    print(f"✅ VL prefix worked! Found {len(related)} related sections")
-except Exception as e:
-    print(f"❌ VL prefix: FAILED - {e}")
\ No newline at end of file
+# Open a method's circuit after two upstream failures rather than the server's five, so
+# once YouTube Music is clearly down the remaining probes fail fast instead of each
+# waiting out a request. Read when ytmusic_client is imported, hence set first
+os.environ.setdefault("YTMUSIC_BREAKER_FAILURES", "2")
+
+from src.utils import ytmusic_client
+from src.utils.ytmusic_client import run_ytmusic
+
+# Seconds a single probe may take before it's reported as failed
+PROBE_TIMEOUT = 10
+
+
+async def probe(call, *args):
+    """Run one ytmusicapi call on the shared pool, returning (result, None) or (None, error)"""
+    try:
+        return await asyncio.wait_for(run_ytmusic(call, *args), PROBE_TIMEOUT), None
+    except asyncio.TimeoutError:
+        return None, TimeoutError(f"no response within {PROBE_TIMEOUT}s")
+    except Exception as e:
+        return None, e
+
+
+# Problematic song ID checked when none are given on the command line
+DEFAULT_SONG_IDS = ["b3rFbkFjRrA"]
+
+
+async def check_song(song_id):
+    """Run the related-content probes for one song, returning its report lines"""
+    report = []
+
+    report.append(f"Testing problematic song ID: {song_id}")
+
+    # get_song and get_watch_playlist both only need the song ID, so they run together
+    (song, song_error), (playlist, playlist_error) = await asyncio.gather(
+        probe(YTMusic.get_song, song_id),
+        probe(YTMusic.get_watch_playlist, song_id),
+    )
+
+    # Test 1: Get song info
+    if song_error is None:
+        report.append(f"✅ get_song keys: {list(song.keys()) if song else 'None'}")
+    else:
+        report.append(f"❌ get_song: FAILED - {song_error}")
+
+    # Test 2: Watch playlist, which carries the browse ID get_song_related expects
+    browse_id = None
+    if playlist_error is None:
+        report.append(f"✅ get_watch_playlist keys: {list(playlist.keys()) if playlist else 'None'}")
+        browse_id = playlist.get('related') if playlist else None
+        if browse_id:
+            report.append(f"Related browse ID: {browse_id}")
+    else:
+        report.append(f"❌ get_watch_playlist: FAILED - {playlist_error}")
+
+    # Test 3: get_song_related with that browse ID, one round trip in the common case
+    if browse_id:
+        related, related_error = await probe(YTMusic.get_song_related, browse_id)
+        if related_error is None:
+            report.append(f"✅ get_song_related({browse_id}): SUCCESS")
+            report.append(f"Found {len(related)} related sections")
+        else:
+            report.append(f"❌ get_song_related({browse_id}): FAILED - {related_error}")
+        return report
+
+    # Without a related browse ID, fall back to guessing it from the song ID: raw,
+    # MPLA prefix (common for browse IDs) and VL prefix (common for playlists)
+    report.append("No 'related' browse ID in the watch playlist, trying song ID prefixes")
+    candidates = [("Direct", song_id), ("MPLA prefix", f"MPLA{song_id}"), ("VL prefix", f"VL{song_id}")]
+    outcomes = await asyncio.gather(
+        *(probe(YTMusic.get_song_related, browse) for _, browse in candidates)
+    )
+    for (label, _), (related, related_error) in zip(candidates, outcomes):
+        if related_error is None:
+            report.append(f"✅ {label} worked! Found {len(related)} related sections")
+        else:
+            report.append(f"❌ {label}: FAILED - {related_error}")
+    return report
+
+
+async def main(song_ids):
+    # Songs are checked concurrently on the shared client pool, which already bounds
+    # how many calls are in flight, and each report is printed whole, in order
+    reports = await asyncio.gather(*(check_song(song_id) for song_id in song_ids))
+    print("\n\n".join("\n".join(report) for report in reports))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1:] or DEFAULT_SONG_IDS))
+    finally:
+        ytmusic_client.shutdown()
@@ -1,8 +1,13 @@
 """Test the /browse/user/{channelId} endpoint with the problematic channel"""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
-BASE_URL = "http://localhost:8000"
+from http_session import BASE_URL, SESSION, ensure_server
+
+# Formatted per channel and endpoint kind (user or artist)
+BROWSE_URL = BASE_URL + "/browse/{kind}/{channel_id}"
 
 def test_user_endpoint():
     """Test with the channel that was causing the musicImmersiveHeaderRenderer error"""
@@ -12,7 +17,7 @@ def test_user_endpoint():
     print(f"\n🧪 Testing /browse/user/{channel_id}")
     print("=" * 70)
     
-    response = requests.get(f"{BASE_URL}/browse/user/{channel_id}", timeout=30)
+    response = SESSION.get(BROWSE_URL.format(kind="user", channel_id=channel_id), timeout=30)
     
     print(f"Status Code: {response.status_code}", end=" ")
     if response.status_code == 200:
@@ -76,7 +81,7 @@ def test_artist_endpoint():
     print(f"\n🧪 Testing /browse/artist/{channel_id} (for comparison)")
     print("=" * 70)
     
-    response = requests.get(f"{BASE_URL}/browse/artist/{channel_id}", timeout=30)
+    response = SESSION.get(BROWSE_URL.format(kind="artist", channel_id=channel_id), timeout=30)
     
     print(f"Status Code: {response.status_code}", end=" ")
     if response.status_code == 200:
@@ -100,6 +105,22 @@ def test_artist_endpoint():
     print("=" * 70)
 
 
+def print_channel_result(label, response):
+    """Print one endpoint's outcome for test_both_channels"""
+    print(f"\n/browse/{label} endpoint:")
+    print(f"  Status: {response.status_code}", end=" ")
+    if response.status_code == 200:
+        print("✅")
+        data = response.json()
+        if 'note' in data:
+            print(f"  Note: {data['note']}")
+        if 'result' in data and 'name' in data['result']:
+            print(f"  Name: {data['result']['name']}")
+    else:
+        print("❌")
+        print(f"  Error: {response.json()}")
+
+
 def test_both_channels():
     """Test both problematic channel IDs"""
     
@@ -107,6 +128,17 @@ def test_both_channels():
         ("UCZwlNfizEaM-kqPTAQ2ptVg", "Kobo Kanaeru - user fails, artist works"),
         ("UCz4jhqrCfthF8NnldZeK_rw", "Channel - user works, artist fails"),
     ]
+    labels = ("user", "artist")
+    
+    # All four requests are independent, so they're sent at once and reported in order afterwards
+    jobs = [(channel_id, label) for channel_id, _ in channels for label in labels]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = {
+            (channel_id, label): executor.submit(
+                SESSION.get, BROWSE_URL.format(kind=label, channel_id=channel_id), timeout=30
+            )
+            for channel_id, label in jobs
+        }
     
     for channel_id, description in channels:
         print(f"\n🧪 Testing {description}")
@@ -114,35 +146,8 @@ def test_both_channels():
         print(f"Channel ID: {channel_id}")
         print("-" * 70)
         
-        # Test user endpoint
-        print("\n/browse/user endpoint:")
-        user_response = requests.get(f"{BASE_URL}/browse/user/{channel_id}", timeout=30)
-        print(f"  Status: {user_response.status_code}", end=" ")
-        if user_response.status_code == 200:
-            print("✅")
-            user_data = user_response.json()
-            if 'note' in user_data:
-                print(f"  Note: {user_data['note']}")
-            if 'result' in user_data and 'name' in user_data['result']:
-                print(f"  Name: {user_data['result']['name']}")
-        else:
-            print("❌")
-            print(f"  Error: {user_response.json()}")
-        
-        # Test artist endpoint
-        print("\n/browse/artist endpoint:")
-        artist_response = requests.get(f"{BASE_URL}/browse/artist/{channel_id}", timeout=30)
-        print(f"  Status: {artist_response.status_code}", end=" ")
-        if artist_response.status_code == 200:
-            print("✅")
-            artist_data = artist_response.json()
-            if 'note' in artist_data:
-                print(f"  Note: {artist_data['note']}")
-            if 'result' in artist_data and 'name' in artist_data['result']:
-                print(f"  Name: {artist_data['result']['name']}")
-        else:
-            print("❌")
-            print(f"  Error: {artist_response.json()}")
+        for label in labels:
+            print_channel_result(label, futures[channel_id, label].result())
         
         print("=" * 70)
 
@@ -156,7 +161,7 @@ if __name__ == "__main__":
     
     try:
         # Test if server is running
-        requests.get(f"{BASE_URL}/docs", timeout=2)
+        ensure_server()
         
         test_both_channels()
         
@@ -1,22 +1,24 @@
 """Test wrong endpoint usage - playlist ID on artist endpoint"""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
-BASE_URL = "http://localhost:8000"
+from http_session import BASE_URL, SESSION, ensure_server
+
+PLAYLIST_ID = "OLAK5uy_m-Cz9P8WPZNzB_FdLxx5Gw3tYc5MetaLI"
 
-def test_playlist_id_on_artist_endpoint():
+def test_playlist_id_on_artist_endpoint(response):
     """Test that playlist IDs are properly detected and rejected on artist endpoint"""
     
     # This is a playlist/album ID, not an artist ID
-    playlist_id = "VLOLAK5uy_m-Cz9P8WPZNzB_FdLxx5Gw3tYc5MetaLI"
+    playlist_id = f"VL{PLAYLIST_ID}"
     
     print(f"\n🧪 Testing /browse/artist/{playlist_id}")
     print("=" * 70)
     print("This should return a helpful error since it's a playlist ID")
     print("-" * 70)
     
-    response = requests.get(f"{BASE_URL}/browse/artist/{playlist_id}", timeout=30)
-    
     print(f"\nStatus Code: {response.status_code}", end=" ")
     if response.status_code == 400:
         print("✅ CORRECT (400 Bad Request)")
@@ -40,17 +42,15 @@ def test_playlist_id_on_artist_endpoint():
     print("=" * 70)
 
 
-def test_correct_endpoints():
+def test_correct_endpoints(response):
     """Test the correct endpoints for comparison"""
     
     # Test playlist endpoint
-    playlist_id = "OLAK5uy_m-Cz9P8WPZNzB_FdLxx5Gw3tYc5MetaLI"
+    playlist_id = PLAYLIST_ID
     
     print(f"\n🧪 Testing correct endpoint: /playlists/{playlist_id}")
     print("=" * 70)
     
-    response = requests.get(f"{BASE_URL}/playlists/{playlist_id}", timeout=30)
-    
     print(f"Status Code: {response.status_code}", end=" ")
     if response.status_code == 200:
         print("✅ SUCCESS!")
@@ -76,10 +76,19 @@ if __name__ == "__main__":
     
     try:
         # Test if server is running
-        requests.get(f"{BASE_URL}/docs", timeout=2)
+        ensure_server()
         
-        test_playlist_id_on_artist_endpoint()
-        test_correct_endpoints()
+        # Both requests are independent, so they're sent at once and reported in order afterwards
+        jobs = {
+            test_playlist_id_on_artist_endpoint: f"{BASE_URL}/browse/artist/VL{PLAYLIST_ID}",
+            test_correct_endpoints: f"{BASE_URL}/playlists/{PLAYLIST_ID}",
+        }
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {
+                test: executor.submit(SESSION.get, url, timeout=30) for test, url in jobs.items()
+            }
+        for test, future in futures.items():
+            test(future.result())
         
         print("\n✅ All tests completed!\n")
         
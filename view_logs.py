@@ -2,9 +2,89 @@
 Simple utility to view and manage log files
 """
 import os
+import re
+import shutil
 import sys
 from datetime import datetime
 
+LOG_FILE = "ytmusic_api.log"
+
+# Bytes read per step when tailing the log backwards from its end
+TAIL_BLOCK = 8192
+
+# Bytes read per step when counting levels for the stats
+STATS_BLOCK = 1 << 20
+
+LEVELS = (b'DEBUG', b'INFO', b'WARNING', b'ERROR', b'CRITICAL')
+
+# The level column written by src/main.py's "%(asctime)s - %(name)s - %(levelname)s - ..."
+# format; the first match is the column itself, not a level named in the message
+LEVEL_RE = re.compile(rb' - (' + b'|'.join(LEVELS) + rb') - ')
+
+
+def line_level(line):
+    """Return the log level of a line read in binary mode, or None if it has none"""
+    match = LEVEL_RE.search(line)
+    return match.group(1) if match else None
+
+
+def log_exists():
+    """Return whether the log file exists, telling the user when it doesn't"""
+    if os.path.exists(LOG_FILE):
+        return True
+    print(f"Log file '{LOG_FILE}' not found!")
+    return False
+
+
+def iter_log_lines():
+    """Stream the log file's lines as bytes, without holding more than one in memory"""
+    with open(LOG_FILE, 'rb') as f:
+        yield from f
+
+
+def iter_log_blocks(size):
+    """Stream the log file as bytes blocks of the given size"""
+    with open(LOG_FILE, 'rb') as f:
+        while block := f.read(size):
+            yield block
+
+
+def tail(path, n, level=None):
+    """
+    Return the last n lines of a file, reading backwards from its end
+    
+    Args:
+        path: File to read
+        n: Number of lines to return
+        level: Only return lines at this log level, reading further back as needed
+    """
+    wanted = level.encode('utf-8') if level else None
+    matched = []
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+        while position > 0 and len(matched) < n:
+            step = min(TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            pieces = (f.read(step) + remainder).splitlines(keepends=True)
+            # The first piece may be the end of a line that starts in an earlier block
+            remainder = pieces.pop(0) if position > 0 and pieces else b''
+            for piece in reversed(pieces):
+                if wanted is None or line_level(piece) == wanted:
+                    matched.append(piece)
+                    if len(matched) == n:
+                        break
+    return [line.decode('utf-8', errors='replace') for line in reversed(matched)]
+
+
+def write_text(text):
+    """Write log lines joined into one string to stdout in a single call, not a print per line"""
+    # Only the file's last line can be missing its newline
+    if text and not text.endswith('\n'):
+        text += '\n'
+    sys.stdout.write(text)
+
 
 def view_logs(lines=50, level=None):
     """
@@ -14,98 +94,89 @@ def view_logs(lines=50, level=None):
         lines: Number of lines to display from the end
         level: Filter by log level (INFO, ERROR, WARNING, etc.)
     """
-    log_file = "ytmusic_api.log"
-    
-    if not os.path.exists(log_file):
-        print(f"Log file '{log_file}' not found!")
+    if not log_exists():
         return
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        all_lines = f.readlines()
-    
-    # Filter by level if specified
-    if level:
-        all_lines = [line for line in all_lines if level.upper() in line]
-    
-    # Get the last N lines
-    display_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+    # Only the end of the file is read, however large the log has grown
+    display_lines = tail(LOG_FILE, lines, level.upper() if level else None)
     
     print(f"\n{'='*80}")
-    print(f"Log File: {log_file}")
-    print(f"Total Lines: {len(all_lines)}")
+    print(f"Log File: {LOG_FILE}")
     print(f"Displaying: {len(display_lines)} lines")
     if level:
         print(f"Filter: {level.upper()}")
     print(f"{'='*80}\n")
     
-    for line in display_lines:
-        print(line.rstrip())
+    write_text("".join(display_lines))
 
 
 def view_errors_only():
     """View only ERROR and CRITICAL level logs"""
-    log_file = "ytmusic_api.log"
-    
-    if not os.path.exists(log_file):
-        print(f"Log file '{log_file}' not found!")
+    if not log_exists():
         return
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        all_lines = f.readlines()
-    
-    error_lines = [line for line in all_lines if 'ERROR' in line or 'CRITICAL' in line]
+    # Only the error lines are kept, never the whole file
+    error_lines = [
+        line for line in iter_log_lines() if line_level(line) in (b'ERROR', b'CRITICAL')
+    ]
     
     print(f"\n{'='*80}")
     print(f"Error Log Summary")
     print(f"Total Errors: {len(error_lines)}")
     print(f"{'='*80}\n")
     
-    for line in error_lines:
-        print(line.rstrip())
+    # Joined as bytes and decoded once rather than line by line
+    write_text(b''.join(error_lines).decode('utf-8', errors='replace'))
 
 
 def log_stats():
     """Display statistics about the log file"""
-    log_file = "ytmusic_api.log"
-    
-    if not os.path.exists(log_file):
-        print(f"Log file '{log_file}' not found!")
+    if not log_exists():
         return
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        all_lines = f.readlines()
-    
-    info_count = sum(1 for line in all_lines if 'INFO' in line)
-    warning_count = sum(1 for line in all_lines if 'WARNING' in line)
-    error_count = sum(1 for line in all_lines if 'ERROR' in line)
-    critical_count = sum(1 for line in all_lines if 'CRITICAL' in line)
-    
-    file_size = os.path.getsize(log_file) / 1024  # KB
+    # Level columns and newlines are counted with bytes.count over large blocks, so the
+    # scan runs in C rather than classifying the file line by line in Python
+    markers = {level: b' - ' + level + b' - ' for level in LEVELS}
+    counts = dict.fromkeys(LEVELS, 0)
+    total = 0
+    # The end of the previous block, so a column split across two blocks is still counted
+    overlap = max(map(len, markers.values())) - 1
+    carry = last_byte = b''
+    for block in iter_log_blocks(STATS_BLOCK):
+        total += block.count(b'\n')
+        for level, marker in markers.items():
+            # Columns inside the block, then one straddling the seam with the last block
+            seam = len(marker) - 1
+            counts[level] += block.count(marker) + (carry[-seam:] + block[:seam]).count(marker)
+        carry = (carry + block[-overlap:])[-overlap:]
+        last_byte = block[-1:]
+    # A final line without a newline still counts
+    if last_byte and last_byte != b'\n':
+        total += 1
+    
+    file_size = os.path.getsize(LOG_FILE) / 1024  # KB
     
     print(f"\n{'='*80}")
-    print(f"Log Statistics for {log_file}")
+    print(f"Log Statistics for {LOG_FILE}")
     print(f"{'='*80}")
     print(f"File Size: {file_size:.2f} KB")
-    print(f"Total Lines: {len(all_lines)}")
+    print(f"Total Lines: {total}")
     print(f"\nLog Level Breakdown:")
-    print(f"  INFO:     {info_count}")
-    print(f"  WARNING:  {warning_count}")
-    print(f"  ERROR:    {error_count}")
-    print(f"  CRITICAL: {critical_count}")
+    print(f"  INFO:     {counts[b'INFO']}")
+    print(f"  WARNING:  {counts[b'WARNING']}")
+    print(f"  ERROR:    {counts[b'ERROR']}")
+    print(f"  CRITICAL: {counts[b'CRITICAL']}")
     print(f"{'='*80}\n")
 
 
 def clear_logs():
     """Clear the log file (with confirmation)"""
-    log_file = "ytmusic_api.log"
-    
-    if not os.path.exists(log_file):
-        print(f"Log file '{log_file}' not found!")
+    if not log_exists():
         return
     
-    response = input(f"Are you sure you want to clear {log_file}? (yes/no): ")
+    response = input(f"Are you sure you want to clear {LOG_FILE}? (yes/no): ")
     if response.lower() in ['yes', 'y']:
-        with open(log_file, 'w', encoding='utf-8') as f:
+        with open(LOG_FILE, 'w', encoding='utf-8') as f:
             f.write(f"# Log cleared at {datetime.now().isoformat()}\n")
         print(f"Log file cleared!")
     else:
@@ -114,24 +185,18 @@ def clear_logs():
 
 def archive_logs():
     """Archive the current log file with timestamp"""
-    log_file = "ytmusic_api.log"
-    
-    if not os.path.exists(log_file):
-        print(f"Log file '{log_file}' not found!")
+    if not log_exists():
         return
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     archive_name = f"ytmusic_api_{timestamp}.log"
     
-    # Copy the log file
-    with open(log_file, 'r', encoding='utf-8') as src:
-        content = src.read()
-    
-    with open(archive_name, 'w', encoding='utf-8') as dst:
-        dst.write(content)
+    # Copy the log file in buffered chunks, without decoding it. It is copied rather
+    # than renamed because a running server keeps appending to the file it opened
+    shutil.copyfile(LOG_FILE, archive_name)
     
     # Clear the original log
-    with open(log_file, 'w', encoding='utf-8') as f:
+    with open(LOG_FILE, 'w', encoding='utf-8') as f:
         f.write(f"# Log archived to {archive_name} at {datetime.now().isoformat()}\n")
     
     print(f"Log archived to: {archive_name}")